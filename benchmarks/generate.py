@@ -0,0 +1,80 @@
+"""Generates a fake Noita install with local and workshop mods, for benchmarking without the game."""
+import argparse
+import json
+import os
+import random
+
+NOITA_APP_ID = "881100"
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(content)
+
+
+def _write_manifest(steam_root, workshop_ids):
+    """Writes Steam's appworkshop manifest listing every workshop mod as installed."""
+    lines = ['"AppWorkshop"', "{", f'\t"appid"\t\t"{NOITA_APP_ID}"', '\t"WorkshopItemsInstalled"', "\t{"]
+    for workshop_id in workshop_ids:
+        lines += [f'\t\t"{workshop_id}"', "\t\t{", f'\t\t\t"size"\t\t"{workshop_id % 100000 * 7}"',
+                  '\t\t\t"timeupdated"\t\t"1700000000"', '\t\t\t"manifest"\t\t"1"', "\t\t}"]
+    lines += ["\t}", '\t"WorkshopItemDetails"', "\t{"]
+    for workshop_id in workshop_ids:
+        lines += [f'\t\t"{workshop_id}"', "\t\t{", '\t\t\t"manifest"\t\t"1"', '\t\t\t"timeupdated"\t\t"1700000000"', "\t\t}"]
+    lines += ["\t}", "}"]
+    _write(os.path.join(steam_root, "steamapps", "workshop", f"appworkshop_{NOITA_APP_ID}.acf"), "\n".join(lines) + "\n")
+
+
+def generate(base, mod_count, preset_count=10, seed=0):
+    """Creates noita/, save/, steam/ and manager.json under base, returns the paths written to manager.json.
+
+    Every other mod is a workshop item, about a third of them are enabled and each preset holds a random half.
+    """
+    rng = random.Random(seed)
+    paths = {name: os.path.join(base, folder) for name, folder in (("noita_root", "noita"), ("noita_save", "save"), ("steam_root", "steam"))}
+    workshop_content = os.path.join(paths["steam_root"], "steamapps", "workshop", "content", NOITA_APP_ID)
+    _write(os.path.join(paths["noita_root"], "noita.exe"), "")
+
+    elements, uids, workshop_ids = [], [], []
+    for index in range(mod_count):
+        if index % 2:
+            workshop_id = 1000000 + index
+            mod_id = f"workshop_mod_{index}"
+            folder = os.path.join(workshop_content, str(workshop_id))
+            uids.append(f"{mod_id}_workshop_{workshop_id}")
+            workshop_ids.append(workshop_id)
+        else:
+            workshop_id = 0
+            mod_id = f"local_mod_{index}"
+            folder = os.path.join(paths["noita_root"], "mods", mod_id)
+            uids.append(mod_id)
+        _write(os.path.join(folder, "mod.xml"), f'<Mod name="Benchmark Mod {index}" description="Generated mod {index}">\n</Mod>\n')
+        _write(os.path.join(folder, "init.lua"), f"-- {mod_id}\n")
+        if workshop_id:
+            # Steam writes the workshop id next to the mod, untracked mod detection reads it
+            _write(os.path.join(folder, "mod_id.txt"), str(workshop_id))
+        enabled = int(rng.random() < 1 / 3)
+        elements.append(f'<Mod enabled="{enabled}" name="{mod_id}" settings_fold_open="0" workshop_item_id="{workshop_id}" >\n\n  </Mod>')
+
+    _write(os.path.join(paths["noita_save"], "save00", "mod_config.xml"), "<Mods>\n\n  " + "\n  ".join(elements) + "\n</Mods>\n")
+    _write(os.path.join(paths["noita_save"], "save_shared", "config.xml"), '<Config mods_sandbox_enabled="1" fullscreen="0" >\n</Config>\n')
+    _write_manifest(paths["steam_root"], workshop_ids)
+
+    presets = {f"Preset {index}": rng.sample(uids, len(uids) // 2) for index in range(preset_count)}
+    _write(os.path.join(base, "manager.json"), json.dumps({"paths": paths, "presets": presets}, indent=4))
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a fake Noita install for benchmarks.")
+    parser.add_argument("directory")
+    parser.add_argument("--mods", type=int, default=1000)
+    parser.add_argument("--presets", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    generate(args.directory, args.mods, args.presets, args.seed)
+
+
+if __name__ == '__main__':
+    main()
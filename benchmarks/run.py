@@ -0,0 +1,187 @@
+"""Times the hot paths on generated installs and prints a JSON report that can be compared between commits.
+
+Run from the repository root:
+    python -m benchmarks.run --sizes 100 1000 10000 --output report.json
+
+Each size runs in a fresh process inside its own temporary install, since helper.shared reads manager.json
+from the working directory on import.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SIZES = (100, 1000, 10000)
+
+
+def measure(function, repeat, setup=None):
+    """Runs setup() then times function() repeat times, returns timings in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"runs": repeat, "min_ms": round(min(timings), 3), "median_ms": round(statistics.median(timings), 3), "max_ms": round(max(timings), 3)}
+
+
+def bench_helpers(results, repeat):
+    import helper.shared
+    from helper.cache import ModMetadataCache
+    mods = helper.shared.mods
+
+    def cold_cache():
+        if os.path.exists("mod_cache.json"):
+            os.remove("mod_cache.json")
+        helper.shared.cache = ModMetadataCache()
+
+    results["read_xml_cold"] = measure(lambda: mods.read_xml(resolve=True), repeat, cold_cache)
+    results["read_xml_warm"] = measure(lambda: mods.read_xml(resolve=True), repeat)
+    results["read_xml_lazy"] = measure(lambda: mods.read_xml(), repeat)
+    results["read_xml_serial"] = measure(lambda: mods.read_xml(workers=1, resolve=True), repeat)
+
+    mods.read_xml(resolve=True)
+    results["write_back_unchanged"] = measure(mods.write_back, repeat)
+
+    def toggle():
+        mods[0].enabled = not mods[0].enabled
+    results["write_back_changed"] = measure(mods.write_back, repeat, toggle)
+
+    names = list(helper.shared.data.presets)
+    cycle = iter(names * repeat)
+    results["preset_apply"] = measure(lambda: helper.shared.presets.apply(next(cycle), mods), repeat)
+
+
+def bench_gui(results, repeat):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication, QMessageBox
+    app = QApplication.instance() or QApplication([])
+    import helper.shared
+    from gui.gui_mod_list import ModList
+    from gui.gui_presets import SettingsPanel
+    from gui.gui_worker import ReadModDataWorker
+
+    helper.shared.mods.read_xml(resolve=True)
+    widgets = []
+
+    def populate():
+        mod_list = ModList()
+        mod_list.adjust_size()
+        mod_list.resize(800, 600)
+        # Grabbing lays out and paints the visible rows
+        mod_list.grab()
+        widgets.append(mod_list)
+    results["gui_populate"] = measure(populate, repeat)
+
+    mod_list = widgets[-1]
+    def read_mods_data():
+        mod_list.mod_list.read_mods_data()
+        mod_list.grab()
+    results["gui_read_mods_data"] = measure(read_mods_data, repeat)
+
+    model = mod_list.mod_list.mod_model
+    def clear():
+        helper.shared.mods.clear()
+        model.reset()
+
+    def read_pipeline():
+        # The worker runs on this thread, so chunks reach the model through direct connections
+        worker = ReadModDataWorker()
+        worker.setAutoDelete(False)
+        worker.signals.chunk.connect(model.append_mods)
+        worker.run()
+        mod_list.grab()
+    results["gui_read_pipeline"] = measure(read_pipeline, repeat, clear)
+
+    panel = SettingsPanel()
+    panel.preset_loaded.connect(mod_list.mod_list.mod_model.mods_changed)
+    QMessageBox.question = staticmethod(lambda *args, **kwargs: QMessageBox.StandardButton.Yes)
+    rows = iter(list(range(panel.presets_list.count())) * repeat)
+
+    def select_preset():
+        panel.presets_list.setCurrentRow(next(rows))
+
+    def load_preset():
+        panel.load_preset()
+        mod_list.grab()
+    results["gui_load_preset"] = measure(load_preset, repeat, select_preset)
+    app.processEvents()
+
+
+def run_size(mod_count, presets, repeat, gui):
+    """Benchmarks one install size in the current process, returns {benchmark: timings}."""
+    from benchmarks.generate import generate
+    results = {}
+    base = tempfile.mkdtemp(prefix=f"modmanager_bench_{mod_count}_")
+    try:
+        generate(base, mod_count, presets)
+        # Icons are loaded relative to the working directory
+        os.symlink(os.path.join(REPO_ROOT, "data"), os.path.join(base, "data"))
+        os.chdir(base)
+        # The code under test reports progress on stdout, which is reserved for the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            bench_helpers(results, repeat)
+            if gui:
+                bench_gui(results, repeat)
+            import helper.shared
+            helper.shared.data.write_to_file()
+    finally:
+        os.chdir(REPO_ROOT)
+        shutil.rmtree(base, ignore_errors=True)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Shitty ModManager on generated installs.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Mod counts to benchmark")
+    parser.add_argument("--presets", type=int, default=10, help="Presets in each generated manager.json")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-gui", action="store_true", help="Skip benchmarks needing PyQt6")
+    parser.add_argument("--output", "-o", help="Write the report to a file instead of stdout")
+    parser.add_argument("--single", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.single is not None:
+        print(json.dumps(run_size(args.single, args.presets, args.repeat, not args.no_gui)))
+        return 0
+
+    report = {"commit": git_commit(), "python": platform.python_version(), "platform": platform.platform(), "repeat": args.repeat, "results": {}}
+    for size in args.sizes:
+        print(f"Benchmarking {size} mods...", file=sys.stderr)
+        command = [sys.executable, "-m", "benchmarks.run", "--single", str(size), "--presets", str(args.presets), "--repeat", str(args.repeat)]
+        if args.no_gui:
+            command.append("--no-gui")
+        process = subprocess.run(command, cwd=REPO_ROOT, capture_output=True, text=True)
+        if process.returncode:
+            print(process.stderr, file=sys.stderr)
+            return process.returncode
+        report["results"][str(size)] = json.loads(process.stdout)
+
+    output = json.dumps(report, indent=4)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
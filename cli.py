@@ -0,0 +1,336 @@
+"""Headless command line interface, for launch scripts and automation. Never imports Qt."""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import helper.shared
+from helper.profiles import Profile, saved_profiles, save_profile, delete_profile, run_batch, apply_preset, sync_order
+
+
+def find_mods(keys):
+    """Returns mods matching each key by UID, mod id or workshop id, and the keys that matched nothing."""
+    found, unknown = [], []
+    for key in keys:
+        # Local mods have workshop id 0, which mustn't match all of them
+        matches = [mod for mod in helper.shared.mods
+                   if key in (mod._uid, mod.id) or (mod.workshop_item_id > 0 and key == str(mod.workshop_item_id))]
+        if matches:
+            found.extend(matches)
+        else:
+            unknown.append(key)
+    return found, unknown
+
+
+def load(resolve=False):
+    """Reads mod and config data, returns False if there is no mod_config.xml to read.
+
+    Mod names and folders are only resolved up front with resolve, otherwise when first used.
+    """
+    if not os.path.exists(helper.shared.mods.mod_config_path()):
+        return False
+    # Diagnostics go to stderr so stdout stays clean for piping
+    with contextlib.redirect_stdout(sys.stderr):
+        helper.shared.mods.read_xml(resolve=resolve)
+        helper.shared.config.read_xml()
+    return True
+
+
+def save(label="Saved from command line"):
+    with contextlib.redirect_stdout(sys.stderr):
+        helper.shared.mods.write_back(label=label)
+        helper.shared.config.write_back()
+
+
+def mod_record(mod):
+    return {
+        "order": mod.order + 1,
+        "enabled": mod.enabled,
+        "id": mod.id,
+        "workshop_item_id": mod.workshop_item_id,
+        "name": mod.name,
+        "folder": mod.folder,
+        "installed": mod.exists,
+    }
+
+
+def command_list(args):
+    for mod in helper.shared.mods:
+        if args.enabled and not mod.enabled:
+            continue
+        marker = "x" if mod.enabled else " "
+        workshop = f" [{mod.workshop_item_id}]" if mod.workshop_item_id > 0 else ""
+        missing = "" if mod.exists else " (missing)"
+        print(f"{mod.order + 1:03} [{marker}] {mod.id}{workshop} {mod.name}{missing}")
+    return 0
+
+
+def command_set_enabled(args, enabled):
+    mods, unknown = find_mods(args.mods)
+    for key in unknown:
+        print(f"Error: No mod matches '{key}'.", file=sys.stderr)
+    if unknown:
+        return 1
+    for mod in mods:
+        mod.enabled = enabled
+    save()
+    return 0
+
+
+def command_apply_preset(args):
+    if args.preset not in helper.shared.data.presets:
+        print(f"Error: No preset named '{args.preset}'.", file=sys.stderr)
+        return 1
+    changes = helper.shared.presets.preview(args.preset, helper.shared.mods)
+    print(changes.summary())
+    restore_settings = args.settings and helper.shared.presets.has_settings(args.preset)
+    if args.settings and not restore_settings:
+        print(f"Preset '{args.preset}' has no mod settings stored.", file=sys.stderr)
+    if args.dry_run:
+        return 0
+    helper.shared.presets.apply(args.preset, helper.shared.mods)
+    save()
+    if restore_settings:
+        try:
+            restored = helper.shared.presets.apply_settings(args.preset, helper.shared.mods.mod_settings)
+        except ValueError as error:
+            print(f"Error: {error}", file=sys.stderr)
+            return 1
+        print(f"Restored settings of {restored} mod(s).")
+    return 0
+
+
+def command_settings(args):
+    mods, unknown = find_mods([args.mod])
+    if unknown:
+        print(f"Error: No mod matches '{args.mod}'.", file=sys.stderr)
+        return 1
+    mod_settings = helper.shared.mods.mod_settings
+    for mod_id in dict.fromkeys(mod.id for mod in mods):
+        for key, (current, upcoming) in mod_settings.settings(mod_id).items():
+            pending = f" (after restart: {upcoming})" if upcoming != current else ""
+            print(f"{mod_id}.{key} = {current}{pending}")
+    return 0
+
+
+def command_move(args):
+    mods, unknown = find_mods([args.mod])
+    if unknown or len(mods) != 1:
+        print(f"Error: '{args.mod}' must match exactly one mod.", file=sys.stderr)
+        return 1
+    mod = mods[0]
+    position = min(max(args.position, 1), len(helper.shared.mods)) - 1
+    helper.shared.mods.remove(mod)
+    helper.shared.mods.insert(position, mod)
+    for index, mod in enumerate(helper.shared.mods):
+        mod.order = index
+    save()
+    return 0
+
+
+def command_export(args):
+    mods = [mod for mod in helper.shared.mods if mod.enabled or not args.enabled]
+    if args.format == "json":
+        output = json.dumps([mod_record(mod) for mod in mods], indent=4)
+    else:
+        output = "\n".join(mod._uid for mod in mods)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+def command_history_list(args):
+    snapshots = helper.shared.mods.history.snapshots()
+    for snapshot in reversed(snapshots[-args.limit:] if args.limit else snapshots):
+        print(snapshot)
+    return 0
+
+
+def command_history_restore(args):
+    history = helper.shared.mods.history
+    try:
+        state = history.state(args.snapshot)
+    except (OSError, ValueError, IndexError) as error:
+        print(f"Error: {error}.", file=sys.stderr)
+        return 1
+    before = {mod._uid: mod.enabled for mod in helper.shared.mods}
+    order = [mod._uid for mod in helper.shared.mods]
+    enabled = dict(state)
+    print(f"Enable {sum(1 for uid, on in enabled.items() if on and not before.get(uid))} mod(s), "
+          f"disable {sum(1 for uid, on in before.items() if on and not enabled.get(uid))} mod(s), "
+          f"load order {'unchanged' if order == [uid for uid, _ in state] else 'changed'}.")
+    if args.dry_run:
+        return 0
+    helper.shared.mods.restore_state(state)
+    save(f"Restored #{args.snapshot}")
+    return 0
+
+
+def build_history_parser(commands):
+    history_parser = commands.add_parser("history", help="List or restore earlier states of mod_config.xml")
+    history_commands = history_parser.add_subparsers(dest="history_command", required=True)
+
+    list_parser = history_commands.add_parser("list", help="List snapshots, newest first")
+    list_parser.add_argument("--limit", type=int, default=20, help="Number of snapshots to show, 0 for all")
+    list_parser.set_defaults(handler=command_history_list, needs_mods=False)
+
+    restore_parser = history_commands.add_parser("restore", help="Restore the load order and enabled mods of a snapshot")
+    restore_parser.add_argument("snapshot", type=int, help="Snapshot number from 'history list'")
+    restore_parser.add_argument("--dry-run", action="store_true", help="Only show what would change")
+    restore_parser.set_defaults(handler=command_history_restore)
+
+
+def command_profiles_list(args):
+    for profile in saved_profiles():
+        print(f"{profile.name}: {profile.paths['noita_save']} ({profile.save_slot})")
+    return 0
+
+
+def command_profiles_add(args):
+    save_profile(Profile(args.name, args.noita_root, args.noita_save, args.steam_root, args.save_slot))
+    return 0
+
+
+def command_profiles_remove(args):
+    if args.name not in helper.shared.data.profiles:
+        print(f"Error: No profile named '{args.name}'.", file=sys.stderr)
+        return 1
+    delete_profile(args.name)
+    return 0
+
+
+def run_profiles_batch(args, operation):
+    """Runs a batch operation on the selected profiles and prints one result line per profile."""
+    try:
+        profiles = saved_profiles(args.profiles)
+    except KeyError as error:
+        print(f"Error: {error.args[0]}", file=sys.stderr)
+        return 1
+    with contextlib.redirect_stdout(sys.stderr):
+        results = run_batch(profiles, operation)
+    for result in results:
+        print(result)
+    return 0 if all(result.ok for result in results) else 1
+
+
+def command_profiles_apply_preset(args):
+    if args.preset not in helper.shared.data.presets:
+        print(f"Error: No preset named '{args.preset}'.", file=sys.stderr)
+        return 1
+    return run_profiles_batch(args, apply_preset(args.preset))
+
+
+def command_profiles_sync_order(args):
+    if args.source == "current":
+        if not load():
+            print("Error: Couldn't read mod_config.xml, check the paths in manager.json.", file=sys.stderr)
+            return 1
+        source_mods = list(helper.shared.mods)
+    else:
+        try:
+            with contextlib.redirect_stdout(sys.stderr):
+                source_mods, _ = saved_profiles([args.source])[0].load()
+        except (KeyError, OSError) as error:
+            print(f"Error: {error.args[0] if isinstance(error, KeyError) else error}", file=sys.stderr)
+            return 1
+    if args.profiles is None:
+        args.profiles = [name for name in helper.shared.data.profiles if name != args.source]
+    return run_profiles_batch(args, sync_order(source_mods))
+
+
+def build_profiles_parser(commands):
+    profiles_parser = commands.add_parser("profiles", help="Manage profiles and run batch operations on them")
+    profile_commands = profiles_parser.add_subparsers(dest="profiles_command", required=True)
+
+    list_parser = profile_commands.add_parser("list", help="List profiles")
+    list_parser.set_defaults(handler=command_profiles_list)
+
+    add_parser = profile_commands.add_parser("add", help="Add or replace a profile")
+    add_parser.add_argument("name")
+    add_parser.add_argument("--noita-root", default="")
+    add_parser.add_argument("--noita-save", required=True)
+    add_parser.add_argument("--steam-root", default="")
+    add_parser.add_argument("--save-slot", default="save00")
+    add_parser.set_defaults(handler=command_profiles_add)
+
+    remove_parser = profile_commands.add_parser("remove", help="Remove a profile")
+    remove_parser.add_argument("name")
+    remove_parser.set_defaults(handler=command_profiles_remove)
+
+    preset_parser = profile_commands.add_parser("apply-preset", help="Apply a preset to several profiles at once")
+    preset_parser.add_argument("preset")
+    preset_parser.add_argument("--profiles", nargs="+", help="Profiles to apply to, all by default")
+    preset_parser.set_defaults(handler=command_profiles_apply_preset)
+
+    sync_parser = profile_commands.add_parser("sync-order", help="Copy load order and enabled mods from one profile to others")
+    sync_parser.add_argument("source", help="Profile to copy from, or 'current' for the configured paths")
+    sync_parser.add_argument("--profiles", nargs="+", help="Profiles to sync, all others by default")
+    sync_parser.set_defaults(handler=command_profiles_sync_order)
+
+    for parser in (list_parser, add_parser, remove_parser, preset_parser, sync_parser):
+        parser.set_defaults(needs_mods=False)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Shitty ModManager command line interface.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="List mods in load order")
+    list_parser.add_argument("--enabled", action="store_true", help="Only list enabled mods")
+    list_parser.set_defaults(handler=command_list, resolve=True)
+
+    enable_parser = commands.add_parser("enable", help="Enable mods by UID, id or workshop id")
+    enable_parser.add_argument("mods", nargs="+")
+    enable_parser.set_defaults(handler=lambda args: command_set_enabled(args, True))
+
+    disable_parser = commands.add_parser("disable", help="Disable mods by UID, id or workshop id")
+    disable_parser.add_argument("mods", nargs="+")
+    disable_parser.set_defaults(handler=lambda args: command_set_enabled(args, False))
+
+    preset_parser = commands.add_parser("apply-preset", help="Enable exactly the mods of a preset")
+    preset_parser.add_argument("preset")
+    preset_parser.add_argument("--dry-run", action="store_true", help="Only show what would change")
+    preset_parser.add_argument("--settings", action="store_true", help="Also restore the mod settings stored with the preset")
+    preset_parser.set_defaults(handler=command_apply_preset)
+
+    settings_parser = commands.add_parser("settings", help="Show the settings of a mod from mod_settings.bin")
+    settings_parser.add_argument("mod", help="UID, id or workshop id")
+    settings_parser.set_defaults(handler=command_settings)
+
+    move_parser = commands.add_parser("move", help="Move a mod to a position in the load order")
+    move_parser.add_argument("mod")
+    move_parser.add_argument("position", type=int, help="1-based position")
+    move_parser.set_defaults(handler=command_move)
+
+    export_parser = commands.add_parser("export", help="Export the mod list")
+    export_parser.add_argument("--format", choices=("json", "uids"), default="json")
+    export_parser.add_argument("--enabled", action="store_true", help="Only export enabled mods")
+    export_parser.add_argument("--output", "-o", help="Write to a file instead of stdout")
+    export_parser.set_defaults(handler=command_export, resolve=True)
+
+    build_history_parser(commands)
+    build_profiles_parser(commands)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    needs_mods = getattr(args, "needs_mods", True)
+    if needs_mods and not load(getattr(args, "resolve", False)):
+        print("Error: Couldn't read mod_config.xml, check the paths in manager.json.", file=sys.stderr)
+        return 1
+    result = args.handler(args)
+    if needs_mods:
+        # Mods are resolved lazily while the command runs, cache what was resolved and report its warnings
+        with contextlib.redirect_stdout(sys.stderr):
+            helper.shared.mods.flush()
+    return result
+
+
+if __name__ == '__main__':
+    sys.exit(main())
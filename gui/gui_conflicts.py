@@ -0,0 +1,91 @@
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QCheckBox, QPushButton, QLabel, QListWidget, QListWidgetItem, QTreeWidget, QTreeWidgetItem, QSplitter
+from PyQt6.QtCore import Qt
+import helper.shared
+from gui.gui_worker import mod_data_pool, ConflictScanWorker
+
+SAME_CONTENT = {True: "Yes", False: "No", None: "Not compared"}
+
+
+class ConflictsDialog(QDialog):
+    """Lists enabled mods overriding the same files, and for each of their files which mod wins."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Mod Conflicts")
+        self.resize(900, 500)
+        self.worker = None
+        self.by_mod = {}
+
+        layout = QVBoxLayout(self)
+        options_layout = QHBoxLayout()
+        self.hash_check = QCheckBox("Compare file contents")
+        self.hash_check.setToolTip("Hash every file to tell identical copies apart from real conflicts, slower")
+        self.hash_check.toggled.connect(lambda checked: self.scan())
+        options_layout.addWidget(self.hash_check)
+        self.rescan_button = QPushButton("Rescan")
+        self.rescan_button.setToolTip("Scan every mod folder again, also ones that look unchanged")
+        self.rescan_button.clicked.connect(lambda: self.scan(force=True))
+        options_layout.addWidget(self.rescan_button)
+        self.status_label = QLabel()
+        options_layout.addWidget(self.status_label, stretch=1)
+        layout.addLayout(options_layout)
+
+        splitter = QSplitter()
+        self.mods_list = QListWidget()
+        self.mods_list.currentItemChanged.connect(self.show_mod_conflicts)
+        splitter.addWidget(self.mods_list)
+        self.files_tree = QTreeWidget()
+        self.files_tree.setHeaderLabels(["File", "Provided by (load order)", "Wins", "Same content"])
+        self.files_tree.setRootIsDecorated(False)
+        self.files_tree.setColumnWidth(0, 220)
+        self.files_tree.setColumnWidth(1, 220)
+        splitter.addWidget(self.files_tree)
+        splitter.setSizes([250, 650])
+        layout.addWidget(splitter, stretch=1)
+
+        self.scan()
+
+    def scan(self, force=False):
+        """Updates the conflict index in the background, only changed mods are scanned unless forced."""
+        if self.worker is not None:
+            return
+        self.worker = ConflictScanWorker(list(helper.shared.mods), self.hash_check.isChecked(), force)
+        self.worker.signals.result.connect(self.on_scanned)
+        self.worker.signals.finished.connect(self.on_scan_finished)
+        self.rescan_button.setEnabled(False)
+        self.hash_check.setEnabled(False)
+        self.status_label.setText("Scanning mod folders...")
+        mod_data_pool().start(self.worker)
+
+    def on_scan_finished(self, completed):
+        self.worker = None
+        self.rescan_button.setEnabled(True)
+        self.hash_check.setEnabled(True)
+        if not completed:
+            self.status_label.setText("Scanning mod folders failed.")
+
+    def on_scanned(self, scanned):
+        self.show_conflicts()
+        self.status_label.setText(f"{len(self.by_mod)} enabled mod(s) share files with another, {scanned} folder(s) scanned.")
+
+    def show_conflicts(self):
+        """Fills the mod list from the conflict index and the current load order and enabled states."""
+        self.by_mod = helper.shared.conflicts.conflicts_by_mod(helper.shared.mods)
+        self.mods_list.clear()
+        self.files_tree.clear()
+        for mod in helper.shared.mods:
+            conflicts = self.by_mod.get(mod._uid)
+            if conflicts:
+                losing = sum(1 for conflict in conflicts if conflict.winner is not mod)
+                item = QListWidgetItem(f"{mod.name or mod.id} ({len(conflicts)} files, {losing} overridden)")
+                item.setData(Qt.ItemDataRole.UserRole, mod._uid)
+                self.mods_list.addItem(item)
+
+    def show_mod_conflicts(self, current, previous=None):
+        self.files_tree.clear()
+        if current is None:
+            return
+        for conflict in self.by_mod.get(current.data(Qt.ItemDataRole.UserRole), []):
+            providers = ", ".join(mod.name or mod.id for mod in conflict.mods)
+            winner = conflict.winner.name or conflict.winner.id
+            self.files_tree.addTopLevelItem(QTreeWidgetItem([conflict.path, providers, winner, SAME_CONTENT[conflict.identical]]))
@@ -1,23 +1,70 @@
-from PyQt6.QtWidgets import QWidget, QHBoxLayout, QPushButton
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QProgressBar
 
 
 class ModControls(QWidget):
-    """Controls with 'Read' and 'Save' buttons."""
+    """Controls with 'Read', 'Save' and 'Add New Mods' buttons, and progress of background jobs."""
 
-    def __init__(self, read_callback, save_callback):
+    def __init__(self, read_callback, save_callback, add_new_callback, conflicts_callback, history_callback, cancel_callback):
         super().__init__()
 
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
         # Layout for the buttons
-        layout = QHBoxLayout(self)
+        buttons_layout = QHBoxLayout()
 
         # Read button
         self.read_button = QPushButton("Read Mod Data")
         self.read_button.clicked.connect(read_callback)
-        layout.addWidget(self.read_button)
+        buttons_layout.addWidget(self.read_button)
 
         # Save button
         self.save_button = QPushButton("Write Mod Data")
-        self.save_button.clicked.connect(save_callback)
-        layout.addWidget(self.save_button)
+        # clicked passes the checked state, which would end up as the history label
+        self.save_button.clicked.connect(lambda: save_callback())
+        buttons_layout.addWidget(self.save_button)
+
+        # Add new mods button
+        self.add_new_button = QPushButton("Add New Mods")
+        self.add_new_button.setToolTip("Add installed mods that are missing from the mod list")
+        self.add_new_button.clicked.connect(add_new_callback)
+        buttons_layout.addWidget(self.add_new_button)
+
+        # Conflicts button
+        self.conflicts_button = QPushButton("Show Conflicts")
+        self.conflicts_button.setToolTip("Show enabled mods that override the same files")
+        self.conflicts_button.clicked.connect(conflicts_callback)
+        buttons_layout.addWidget(self.conflicts_button)
+
+        # History button
+        self.history_button = QPushButton("History")
+        self.history_button.setToolTip("Restore an earlier load order from the history of writes")
+        self.history_button.clicked.connect(history_callback)
+        buttons_layout.addWidget(self.history_button)
+
+        layout.addLayout(buttons_layout)
+
+        # Progress of the running job, hidden while idle
+        progress_layout = QHBoxLayout()
+        self.progress_bar = QProgressBar()
+        progress_layout.addWidget(self.progress_bar)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(cancel_callback)
+        progress_layout.addWidget(self.cancel_button)
+        layout.addLayout(progress_layout)
+        self.set_busy(False)
 
         self.setLayout(layout)
+
+    def set_busy(self, busy, cancellable=False):
+        """Disables the buttons and shows the progress bar while a job is running."""
+        for button in (self.read_button, self.save_button, self.add_new_button, self.conflicts_button, self.history_button):
+            button.setEnabled(not busy)
+        self.progress_bar.setVisible(busy)
+        self.progress_bar.setRange(0, 0)
+        self.cancel_button.setVisible(busy and cancellable)
+
+    def set_progress(self, done, total):
+        """Shows progress of the running job, a total of 0 shows a busy indicator."""
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(done)
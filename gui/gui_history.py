@@ -0,0 +1,56 @@
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QTreeWidget, QTreeWidgetItem, QMessageBox
+from PyQt6.QtCore import Qt, pyqtSignal
+import helper.shared
+import time
+
+
+class HistoryDialog(QDialog):
+    """Lists snapshots recorded on every write of mod_config.xml and restores a selected one."""
+
+    # Emitted with the id of the snapshot to restore
+    restore_requested = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Mod Config History")
+        self.resize(600, 400)
+
+        layout = QVBoxLayout(self)
+        self.snapshots_tree = QTreeWidget()
+        self.snapshots_tree.setHeaderLabels(["#", "Time", "Change", "Enabled"])
+        self.snapshots_tree.setRootIsDecorated(False)
+        self.snapshots_tree.setColumnWidth(0, 50)
+        self.snapshots_tree.setColumnWidth(1, 150)
+        self.snapshots_tree.setColumnWidth(2, 230)
+        self.snapshots_tree.itemDoubleClicked.connect(lambda item, column: self.restore())
+        layout.addWidget(self.snapshots_tree)
+
+        buttons_layout = QHBoxLayout()
+        refresh_button = QPushButton("Refresh")
+        refresh_button.clicked.connect(self.update_snapshots)
+        buttons_layout.addWidget(refresh_button)
+        restore_button = QPushButton("Restore")
+        restore_button.clicked.connect(self.restore)
+        buttons_layout.addWidget(restore_button)
+        layout.addLayout(buttons_layout)
+
+        self.update_snapshots()
+
+    def update_snapshots(self):
+        """Fills the list with snapshots, newest first."""
+        self.snapshots_tree.clear()
+        for snapshot in reversed(helper.shared.mods.history.snapshots()):
+            when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(snapshot.time))
+            item = QTreeWidgetItem([str(snapshot.id), when, str(snapshot.label), f"{snapshot.enabled_count} / {snapshot.mod_count}"])
+            item.setData(0, Qt.ItemDataRole.UserRole, snapshot.id)
+            self.snapshots_tree.addTopLevelItem(item)
+
+    def restore(self):
+        item = self.snapshots_tree.currentItem()
+        if item is None:
+            QMessageBox.warning(self, "Error", "Please select a snapshot to restore.")
+            return
+        snapshot_id = item.data(0, Qt.ItemDataRole.UserRole)
+        response = QMessageBox.question(self, "Confirm Restore", f"Restore the load order and enabled mods of snapshot #{snapshot_id} and write them to mod_config.xml?")
+        if response == QMessageBox.StandardButton.Yes:
+            self.restore_requested.emit(snapshot_id)
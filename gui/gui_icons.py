@@ -0,0 +1,91 @@
+import os
+from collections import OrderedDict
+from PyQt6.QtCore import Qt, QSize
+from PyQt6.QtGui import QIcon, QImageReader, QPixmap
+import helper.shared
+
+ICON_DIR = "data/icons"
+PREVIEW_FILE = "preview.png"
+
+_icons = {}
+_pixmaps = {}
+
+
+def icon(name) -> QIcon:
+    """Returns the icon data/icons/<name>.svg, loaded from disk once and shared by every widget."""
+    cached = _icons.get(name)
+    if cached is None:
+        cached = _icons[name] = QIcon(os.path.join(ICON_DIR, f"{name}.svg"))
+    return cached
+
+
+def pixmap(name, size, device_pixel_ratio=1.0) -> QPixmap:
+    """Returns an icon rasterized at size logical pixels, once per device pixel ratio."""
+    key = (name, size, device_pixel_ratio)
+    cached = _pixmaps.get(key)
+    if cached is None:
+        cached = _pixmaps[key] = icon(name).pixmap(QSize(size, size), device_pixel_ratio)
+    return cached
+
+
+class ThumbnailCache:
+    """Workshop preview images scaled down to thumbnails, least recently used ones are dropped over max_bytes."""
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        # (folder, size, device pixel ratio) -> QPixmap, or None for folders without a preview
+        self._thumbnails = OrderedDict()
+
+    def get(self, folder, size, device_pixel_ratio=1.0):
+        """Returns the thumbnail of the preview in folder, or None if it has none."""
+        key = (folder, size, device_pixel_ratio)
+        if key in self._thumbnails:
+            self._thumbnails.move_to_end(key)
+            return self._thumbnails[key]
+
+        thumbnail = self._load(os.path.join(folder, PREVIEW_FILE), round(size * device_pixel_ratio))
+        if thumbnail is not None:
+            thumbnail.setDevicePixelRatio(device_pixel_ratio)
+            self.used_bytes += self._cost(thumbnail)
+        self._thumbnails[key] = thumbnail
+        self._evict()
+        return thumbnail
+
+    @staticmethod
+    def _load(path, pixels):
+        if not os.path.isfile(path):
+            return None
+        reader = QImageReader(path)
+        source = reader.size()
+        if source.isValid():
+            # Let the decoder scale, so full size previews never have to be held in memory
+            reader.setScaledSize(source.scaled(pixels, pixels, Qt.AspectRatioMode.KeepAspectRatio))
+        image = reader.read()
+        if image.isNull():
+            return None
+        return QPixmap.fromImage(image)
+
+    @staticmethod
+    def _cost(thumbnail):
+        return thumbnail.width() * thumbnail.height() * thumbnail.depth() // 8 if thumbnail else 0
+
+    def _evict(self):
+        while self.used_bytes > self.max_bytes and len(self._thumbnails) > 1:
+            _, thumbnail = self._thumbnails.popitem(last=False)
+            self.used_bytes -= self._cost(thumbnail)
+
+    def clear(self):
+        self._thumbnails.clear()
+        self.used_bytes = 0
+
+
+_thumbnails = None
+
+
+def thumbnails() -> ThumbnailCache:
+    """Returns the thumbnail cache shared by every mod list, bounded by the thumbnail_cache_mb setting."""
+    global _thumbnails
+    if _thumbnails is None:
+        _thumbnails = ThumbnailCache(helper.shared.data.settings["thumbnail_cache_mb"] * 1024 * 1024)
+    return _thumbnails
@@ -1,26 +1,44 @@
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QMessageBox
+from PyQt6.QtGui import QKeySequence, QShortcut
 from gui.gui_mod_list import ModList
 from gui.gui_controls import ModControls
 from gui.gui_presets import SettingsPanel
 from gui.gui_path_selector import PathSelectorSection
+from gui.gui_worker import mod_data_pool, ReadModDataWorker, RefreshModDataWorker, WriteModDataWorker
+from gui.gui_watcher import ModFilesWatcher
 import helper.shared
+import helper.startup
+import helper.trace
 
 
 class ShittyModManager(QWidget):
     def __init__(self):
         super().__init__()
-        self.setWindowTitle('Shitty ModManager')
+
+        # Background job currently running, and the mod list to restore if a read is cancelled
+        self.worker = None
+        self.previous_mods = []
+        self.conflicts_dialog = None
+        self.history_dialog = None
+        # Set once the mod list was first loaded, and when paths change while a job is running
+        self.mods_loaded = False
+        self.reload_pending = False
 
         # Initialize components
         self.mod_list = ModList()
 
         # New mod data control buttons directly below ScrollBox
-        mod_data_controls = ModControls(self.read_mod_data, self.write_mod_data)
+        self.mod_data_controls = ModControls(self.read_mod_data, self.write_mod_data, self.add_new_mods, self.show_conflicts, self.show_history, self.cancel_job)
 
         # Other UI components
-        settings_panel = SettingsPanel()
-        settings_panel.preset_loaded.connect(self.mod_list.mod_list.read_mods_data)
-        self.path_selector_section = PathSelectorSection(self.mod_list.mod_list.read_mods_data)
+        self.settings_panel = settings_panel = SettingsPanel()
+        settings_panel.preset_loaded.connect(self.mod_list.mod_list.mod_model.mods_changed)
+        self.path_selector_section = PathSelectorSection()
+        self.path_selector_section.path_selector.validated.connect(self.paths_validated)
+
+        # Live rescans when mods are installed, removed or Noita rewrites mod_config.xml
+        self.files_watcher = ModFilesWatcher(self)
+        self.files_watcher.changed.connect(self.refresh_mod_data)
 
         # Main layout
         main_layout = QVBoxLayout(self)
@@ -33,7 +51,7 @@ class ShittyModManager(QWidget):
         mod_list_layout = QVBoxLayout(mod_list_widget)
         mod_list_layout.setContentsMargins(0, 0, 0, 0)
         mod_list_layout.addWidget(self.mod_list)       # Add ScrollBox
-        mod_list_layout.addWidget(mod_data_controls)   # Add Read/Save buttons directly under ScrollBox
+        mod_list_layout.addWidget(self.mod_data_controls)   # Add Read/Save buttons directly under ScrollBox
 
         # Add mod list layout and settings panel to upper layout
         upper_layout.addWidget(mod_list_widget, stretch=3)
@@ -45,21 +63,61 @@ class ShittyModManager(QWidget):
 
         self.setLayout(main_layout)
 
+        # Hidden toggle for recording a Chrome trace, same as setting MODMANAGER_TRACE
+        QShortcut(QKeySequence("Ctrl+Alt+Shift+T"), self).activated.connect(self.toggle_tracing)
+        self.update_title()
+        helper.startup.mark("create window")
+
         self.initialize()
 
+    def update_title(self):
+        self.setWindowTitle('Shitty ModManager' + (' [tracing]' if helper.trace.is_enabled() else ''))
+
+    def toggle_tracing(self):
+        """Starts recording a trace, or stops and writes it."""
+        if helper.trace.is_enabled():
+            helper.trace.disable()
+        else:
+            helper.trace.enable()
+        self.update_title()
+
     def initialize(self):
-        self.check_paths_on_startup()
+        # Mods are loaded once the stored paths are verified in the background, so the window shows as fast for any number of mods
         self.show()
         self.mod_list.adjust_size()
+        helper.startup.mark("show window")
 
-    def check_paths_on_startup(self):
-        """Checks if all paths are set, and prompts if missing."""
-        if self.path_selector_section.path_selector.are_paths_complete():
+    def paths_validated(self, complete):
+        """Loads the mods once per settled change of the paths, from the snapshot the first time."""
+        if not complete:
+            # Startup ends here when paths still have to be entered
+            helper.startup.report()
+            return
+        helper.startup.mark("verify paths")
+        self.files_watcher.watch()
+        if self.worker is not None:
+            # Read the new paths once the running job is done
+            self.reload_pending = True
+            self.cancel_job()
+        elif self.mods_loaded:
             self.read_mod_data()
-            self.path_selector_section.init_done = True
         else:
-            self.path_selector_section.fold_button.setChecked(True)
-            self.path_selector_section.toggle_path_selector()
+            self.load_mod_data()
+        self.mods_loaded = True
+
+    def load_mod_data(self):
+        """Shows the mod list as it was last read or written, then brings it up to date in the background.
+
+        Without a snapshot of the current mod_config.xml the mods are read from scratch.
+        """
+        mods = helper.shared.mods.read_snapshot()
+        if mods is None:
+            self.read_mod_data()
+            return
+        helper.shared.mods[:] = mods
+        self.mod_list.mod_list.read_mods_data()
+        helper.startup.mark("show mod list snapshot")
+        self.refresh_mod_data(read_config=True)
 
     def check_paths_complete(self):
         """Verify if all necessary paths are complete."""
@@ -69,20 +127,149 @@ class ShittyModManager(QWidget):
         return True
 
     def read_mod_data(self):
-        """Reads mod data."""
+        """Reads mod data in the background, filling the mod list as mods are resolved."""
+        if not self.check_paths_complete():
+            return
+
+        worker = ReadModDataWorker()
+        worker.signals.started.connect(self.on_read_started)
+        worker.signals.chunk.connect(self.mod_list.mod_list.mod_model.append_mods)
+        worker.signals.finished.connect(self.on_read_finished)
+        self.start_job(worker, cancellable=True)
+        print("Reading mods...")
+
+    def refresh_mod_data(self, read_config=False):
+        """Merges changes made on disk into the mod list without rebuilding it."""
+        if not self.path_selector_section.path_selector.are_paths_complete():
+            return
+        if self.worker is not None:
+            # Try again once the running job is done
+            self.files_watcher.schedule()
+            return
+
+        worker = RefreshModDataWorker(read_config)
+        worker.signals.result.connect(lambda result: self.mod_list.mod_list.mod_model.sync_mods(*result))
+        self.start_job(worker)
+
+    def write_mod_data(self, label="Saved"):
+        """Writes mod data back to file in the background."""
+        if not self.check_paths_complete():
+            return
+
+        worker = WriteModDataWorker(list(helper.shared.mods), label)
+        worker.signals.finished.connect(self.on_write_finished)
+        self.start_job(worker)
+
+    def start_job(self, worker, cancellable=False):
+        """Queues a mod data job, jobs run one at a time so a save never races with a reload."""
+        self.worker = worker
+        worker.signals.progress.connect(self.mod_data_controls.set_progress)
+        worker.signals.failed.connect(lambda error: QMessageBox.warning(self, "Error", error))
+        worker.signals.finished.connect(self.on_job_finished)
+        self.mod_data_controls.set_busy(True, cancellable)
+        if cancellable:
+            # Reads refill the mod list, presets and edits would only see the part read so far
+            self.set_edits_locked(True)
+        mod_data_pool().start(worker)
+
+    def set_edits_locked(self, locked):
+        """Blocks changes to the mod list and presets while the list is incomplete or about to be replaced."""
+        self.mod_list.mod_list.set_editable(not locked)
+        self.settings_panel.setEnabled(not locked)
+
+    def cancel_job(self):
+        if self.worker is not None:
+            self.worker.cancel()
+
+    def on_job_finished(self):
+        self.worker = None
+        self.mod_data_controls.set_busy(False)
+        self.set_edits_locked(False)
+        # The first job after startup reads or reconciles the mod list
+        helper.startup.mark("read mods from disk")
+        helper.startup.report()
+        if self.reload_pending:
+            self.reload_pending = False
+            self.read_mod_data()
+
+    def on_read_started(self):
+        self.previous_mods = list(helper.shared.mods)
+        helper.shared.mods.clear()
+        self.mod_list.mod_list.read_mods_data()
+
+    def on_read_finished(self, completed):
+        if not completed:
+            # A partial list must never be written back, so bring back what was there before
+            helper.shared.mods[:] = self.previous_mods
+            self.mod_list.mod_list.read_mods_data()
+            print("Reading mods cancelled.")
+        self.previous_mods = []
+
+    def on_write_finished(self, completed):
+        if completed:
+            print("Saved mods.")
+
+    def closeEvent(self, event):
+        self.cancel_job()
+        mod_data_pool().waitForDone()
+        super().closeEvent(event)
+
+    def add_new_mods(self):
+        """Offers to add installed mods that are missing from the mod list."""
         if not self.check_paths_complete():
             return
 
-        helper.shared.mods.read_xml()
-        helper.shared.config.read_xml()
+        untracked = helper.shared.mods.untracked_mods()
+        if not untracked:
+            QMessageBox.information(self, "Add New Mods", "All installed mods are already in the mod list.")
+            return
+
+        names = "\n".join(mod.name or mod.id for mod in untracked[:20])
+        if len(untracked) > 20:
+            names += f"\n... and {len(untracked) - 20} more"
+        response = QMessageBox.question(self, "Add New Mods", f"Found {len(untracked)} installed mod(s) missing from the mod list:\n{names}\n\nAdd them as disabled?")
+        if response != QMessageBox.StandardButton.Yes:
+            return
+
+        helper.shared.mods.extend(untracked)
         self.mod_list.mod_list.read_mods_data()
         self.mod_list.adjust_size()
-        print("Reading mods...")
 
-    def write_mod_data(self):
-        """Writes mod data back to file."""
+    def show_conflicts(self):
+        """Opens the conflicts dialog, or brings it up to date if it's already open."""
+        if not self.check_paths_complete():
+            return
+        if self.conflicts_dialog is None:
+            from gui.gui_conflicts import ConflictsDialog
+            self.conflicts_dialog = ConflictsDialog(self)
+        else:
+            self.conflicts_dialog.scan()
+        self.conflicts_dialog.show()
+        self.conflicts_dialog.raise_()
+
+    def show_history(self):
         if not self.check_paths_complete():
             return
-        helper.shared.mods.write_back()
-        helper.shared.config.write_back()
-        print("Saved mods.")
+        if self.history_dialog is None:
+            from gui.gui_history import HistoryDialog
+            self.history_dialog = HistoryDialog(self)
+            self.history_dialog.restore_requested.connect(self.restore_snapshot)
+        else:
+            self.history_dialog.update_snapshots()
+        self.history_dialog.show()
+        self.history_dialog.raise_()
+
+    def restore_snapshot(self, snapshot_id):
+        """Brings back the load order and enabled mods of a history snapshot and writes them."""
+        if self.worker is not None:
+            QMessageBox.warning(self, "Error", "Wait for the running job to finish first.")
+            return
+        try:
+            state = helper.shared.mods.history.state(snapshot_id)
+        except (OSError, ValueError, IndexError) as error:
+            # The history file can be changed or removed after the dialog listed it
+            QMessageBox.warning(self, "Error", f"Couldn't restore #{snapshot_id}: {error}")
+            return
+        helper.shared.mods.restore_state(state)
+        self.mod_list.mod_list.read_mods_data()
+        self.write_mod_data(f"Restored #{snapshot_id}")
@@ -1,101 +1,371 @@
-from PyQt6.QtWidgets import QLayout, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QCheckBox, QListWidget, QListWidgetItem, QPushButton, QSizePolicy
-from PyQt6.QtCore import pyqtSignal
-from PyQt6.QtGui import QIcon
-from typing import cast
+from PyQt6.QtWidgets import QLayout, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QListView, QSizePolicy, QStyle, QStyledItemDelegate, QStyleOptionButton, QStyleOptionViewItem, QToolTip, QApplication, QAbstractItemView
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QEvent, QRect, QSize
+from PyQt6.QtGui import QAction, QKeySequence, QPalette
 import helper.shared
+from helper.parser import CONFIG_ATTRIBUTES, FOLDER_ATTRIBUTES
+from helper.trace import traced
+from gui.gui_icons import pixmap, thumbnails
+from gui.gui_search import ModSearchBar
 import webbrowser
 import os
 
 MOD_ID_WIDTH = 200
-
-
-class ModItemWidget(QWidget):
-    checkbox_toggled = pyqtSignal(QWidget)
-
-    def __init__(self, mod):
-        super().__init__()
-        self.mod = mod
-
-        layout = QHBoxLayout()
-        layout.setContentsMargins(11, 5, 0, 5)
-
-        # Order label
-        self.label_order = QLabel(f'{mod.order + 1:03}')
-        self.label_order.setFixedWidth(41)
-        layout.addWidget(self.label_order)
+ORDER_WIDTH = 20
+ENABLED_WIDTH = 70
+BUTTON_WIDTH = 40
+COLUMN_SPACING = 6
+HEADER_MARGIN = 21
+ROW_MARGIN = 11
+ROW_HEIGHT = 34
+ICON_SIZE = 16
+THUMBNAIL_SIZE = ROW_HEIGHT - 8
+# Mod settings listed in the tooltip of a mod
+TOOLTIP_SETTINGS = 8
+ROW_WIDTH = HEADER_MARGIN + ORDER_WIDTH + ENABLED_WIDTH + 2 * MOD_ID_WIDTH + BUTTON_WIDTH + 4 * COLUMN_SPACING
+
+MOD_ROLE = Qt.ItemDataRole.UserRole
+
+
+def open_folder(mod):
+    folder_path = mod.folder
+    if os.path.exists(folder_path):
+        os.startfile(folder_path) if os.name == 'nt' else os.system(f'open "{folder_path}"')
+
+
+def open_steam_page(mod):
+    steam_url = f"https://steamcommunity.com/sharedfiles/filedetails/?id={mod.workshop_item_id}"
+    webbrowser.open(steam_url)
+
+
+class ModListModel(QAbstractListModel):
+    """List model over helper.shared.mods, rows are painted by ModItemDelegate."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Cleared while the mod list is being read, so a half-filled list can't be edited
+        self.editable = True
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(helper.shared.mods)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(helper.shared.mods):
+            return None
+
+        mod = helper.shared.mods[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return mod.name
+        if role == Qt.ItemDataRole.CheckStateRole:
+            return Qt.CheckState.Checked if mod.enabled else Qt.CheckState.Unchecked
+        if role == Qt.ItemDataRole.ToolTipRole:
+            tooltip = mod.folder if mod.exists else f"Mod folder not found:\n{mod.folder}"
+            presets = helper.shared.presets.presets_with(mod._uid)
+            if presets:
+                tooltip += f"\nIn presets: {', '.join(presets)}"
+            # Only the settings of the hovered mod are decoded
+            settings = helper.shared.mods.mod_settings.settings(mod.id)
+            if settings:
+                lines = [f"  {key} = {current}" for key, (current, _) in list(settings.items())[:TOOLTIP_SETTINGS]]
+                if len(settings) > TOOLTIP_SETTINGS:
+                    lines.append(f"  ... and {len(settings) - TOOLTIP_SETTINGS} more")
+                tooltip += "\nSettings:\n" + "\n".join(lines)
+            return tooltip
+        if role == MOD_ROLE:
+            return mod
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.CheckStateRole or not self.editable:
+            return False
+
+        helper.shared.mods[index.row()].enabled = Qt.CheckState(value) == Qt.CheckState.Checked
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.CheckStateRole])
+        return True
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.ItemIsDropEnabled if self.editable else Qt.ItemFlag.NoItemFlags
+        if not self.editable:
+            return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+        return (Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+                | Qt.ItemFlag.ItemIsUserCheckable | Qt.ItemFlag.ItemIsDragEnabled)
+
+    def supportedDropActions(self):
+        return Qt.DropAction.MoveAction
+
+    @traced("set mods enabled")
+    def set_enabled(self, rows, enabled):
+        """Enables or disables the given rows, or inverts them if enabled is None, with a single change notification."""
+        mods = helper.shared.mods
+        changed = []
+        for row in rows:
+            mod = mods[row]
+            state = not mod.enabled if enabled is None else enabled
+            if mod.enabled != state:
+                mod.enabled = state
+                changed.append(row)
+        self._rows_changed(changed)
+        return len(changed)
+
+    def mods_changed(self, changed_mods):
+        """Notifies views that mods were enabled or disabled in place, such as by loading a preset."""
+        changed = {id(mod) for mod in changed_mods}
+        self._rows_changed([row for row, mod in enumerate(helper.shared.mods) if id(mod) in changed])
+
+    def _rows_changed(self, rows):
+        if rows:
+            self.dataChanged.emit(self.index(min(rows)), self.index(max(rows)), [Qt.ItemDataRole.CheckStateRole])
+
+    @traced("populate mod list")
+    def reset(self):
+        """Notifies views that helper.shared.mods was replaced."""
+        self.beginResetModel()
+        self.endResetModel()
+
+    @traced("append mods to list")
+    def append_mods(self, mods):
+        """Appends a chunk of mods to helper.shared.mods, inserting only the new rows."""
+        if not mods:
+            return
+        first = len(helper.shared.mods)
+        self.beginInsertRows(QModelIndex(), first, first + len(mods) - 1)
+        helper.shared.mods.extend(mods)
+        self.endInsertRows()
+
+    @traced("sync mod list")
+    def sync_mods(self, fresh_mods, config_changed):
+        """Merges mods freshly read from disk into helper.shared.mods, touching only rows that changed.
+
+        Unless mod_config.xml itself changed, only folder information is refreshed so unsaved edits are kept.
+        """
+        mods = helper.shared.mods
+        fresh = {mod._uid: mod for mod in fresh_mods}
+
+        if config_changed:
+            # Drop mods that are gone from mod_config.xml
+            for row in range(len(mods) - 1, -1, -1):
+                if mods[row]._uid not in fresh:
+                    self.beginRemoveRows(QModelIndex(), row, row)
+                    del mods[row]
+                    self.endRemoveRows()
+
+        attributes = CONFIG_ATTRIBUTES + FOLDER_ATTRIBUTES if config_changed else FOLDER_ATTRIBUTES
+        changed_rows = [row for row, mod in enumerate(mods) if mod._uid in fresh and mod.update_from(fresh[mod._uid], attributes)]
+
+        if config_changed:
+            known = {mod._uid for mod in mods}
+            self.append_mods([mod for mod in fresh_mods if mod._uid not in known])
+            if [mod._uid for mod in mods] != [mod._uid for mod in fresh_mods]:
+                position = {mod._uid: row for row, mod in enumerate(fresh_mods)}
+                self._reorder([position[mod._uid] for mod in mods])
+                changed_rows = range(len(mods))
+
+        if changed_rows:
+            self.dataChanged.emit(self.index(min(changed_rows)), self.index(max(changed_rows)))
+
+    def _reorder(self, new_rows):
+        """Moves every mod to its row in new_rows, keeping selections on the same mods."""
+        mods = helper.shared.mods
+        self.layoutAboutToBeChanged.emit()
+        reordered = [None] * len(mods)
+        for row, new_row in enumerate(new_rows):
+            reordered[new_row] = mods[row]
+        for old_index in self.persistentIndexList():
+            self.changePersistentIndex(old_index, self.index(new_rows[old_index.row()]))
+        mods[:] = reordered
+        self.layoutChanged.emit()
+
+    @traced("move rows")
+    def move_rows(self, rows, destination):
+        """Moves the given rows so they end up before the row at destination, keeping their relative order.
+
+        Only the span between the moved rows and the destination is touched, the rest of the list keeps its rows.
+        """
+        rows = sorted(set(rows))
+        if not rows:
+            return
+        contiguous = rows[-1] - rows[0] + 1 == len(rows)
+        if contiguous and rows[0] <= destination <= rows[-1] + 1:
+            return  # Dropped onto itself
+
+        first = min(rows[0], destination)
+        last = max(rows[-1] + 1, destination)
+        if contiguous:
+            self.beginMoveRows(QModelIndex(), rows[0], rows[-1], QModelIndex(), destination)
+            self._move_slice(rows, destination, first, last)
+            self.endMoveRows()
+        else:
+            self.layoutAboutToBeChanged.emit()
+            old_span = helper.shared.mods[first:last]
+            self._move_slice(rows, destination, first, last)
+            for old_index in self.persistentIndexList():
+                if first <= old_index.row() < last:
+                    self.changePersistentIndex(old_index, self.index(old_span[old_index.row() - first].order))
+            self.layoutChanged.emit()
+        self.dataChanged.emit(self.index(first), self.index(last - 1), [Qt.ItemDataRole.DisplayRole])
+
+    def _move_slice(self, rows, destination, first, last):
+        """Rearranges helper.shared.mods[first:last] with a slice assignment and renumbers that span."""
+        mods = helper.shared.mods
+        moving_rows = set(rows)
+        moving = [mods[row] for row in rows]
+        staying = [mod for row, mod in enumerate(mods[first:last], first) if row not in moving_rows]
+        insert_at = destination - first - sum(1 for row in rows if row < destination)
+        mods[first:last] = staying[:insert_at] + moving + staying[insert_at:]
+        self.update_mod_orders(first, last)
+
+    @staticmethod
+    def update_mod_orders(first, last):
+        """Renumbers mods between first and last (exclusive) to match their position in the list."""
+        mods = helper.shared.mods
+        for index in range(first, last):
+            mods[index].order = index
+
+
+class ModItemDelegate(QStyledItemDelegate):
+    """Paints a mod row with order, checkbox, name, id, and Steam and folder buttons."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.show_thumbnails = helper.shared.data.settings["preview_thumbnails"]
+
+    @staticmethod
+    def column_rects(rect):
+        """Returns the rectangles of each column of a row, lined up with HeaderWidget."""
+        top, height = rect.top(), rect.height()
+        # The order number needs more room than the '#' header, so it starts further left
+        rects = {"order": QRect(rect.left() + ROW_MARGIN, top, HEADER_MARGIN - ROW_MARGIN + ORDER_WIDTH, height)}
+        x = rect.left() + HEADER_MARGIN + ORDER_WIDTH + COLUMN_SPACING
+        for column, width in (("checkbox", ENABLED_WIDTH), ("name", MOD_ID_WIDTH), ("id", MOD_ID_WIDTH), ("folder", BUTTON_WIDTH)):
+            rects[column] = QRect(x, top, width, height)
+            x += width + COLUMN_SPACING
+        rects["steam"] = QRect(rects["id"].right() - BUTTON_WIDTH + 1, top, BUTTON_WIDTH, height)
+        return rects
+
+    @staticmethod
+    def _centered(rect, size):
+        return QRect(rect.left() + (rect.width() - size) // 2, rect.top() + (rect.height() - size) // 2, size, size)
+
+    @staticmethod
+    def _checkbox_rect(rects, style, widget):
+        """Returns the checkbox indicator rectangle, at the start of the 'Enabled' column."""
+        size = style.pixelMetric(QStyle.PixelMetric.PM_IndicatorWidth, None, widget)
+        column = rects["checkbox"]
+        return QRect(column.left(), column.top() + (column.height() - size) // 2, size, size)
+
+    @staticmethod
+    def _style(option):
+        return option.widget.style() if option.widget else QApplication.style()
+
+    def sizeHint(self, option, index):
+        return QSize(ROW_WIDTH, ROW_HEIGHT)
+
+    def paint(self, painter, option, index):
+        mod = index.data(MOD_ROLE)
+        if mod is None:
+            return
+
+        widget = option.widget
+        style = self._style(option)
+
+        # Selection and hover background
+        background = QStyleOptionViewItem(option)
+        style.drawPrimitive(QStyle.PrimitiveElement.PE_PanelItemViewItem, background, painter, widget)
+
+        rects = self.column_rects(option.rect)
+        selected = bool(option.state & QStyle.StateFlag.State_Selected)
+        painter.save()
+        painter.setPen(option.palette.color(QPalette.ColorRole.HighlightedText if selected else QPalette.ColorRole.Text))
+        align = Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter
+        metrics = option.fontMetrics
+
+        device_pixel_ratio = painter.device().devicePixelRatioF()
+        painter.drawText(rects["order"], align, f'{mod.order + 1:03}')
+        name_rect = rects["name"]
+        thumbnail = thumbnails().get(mod.folder, THUMBNAIL_SIZE, device_pixel_ratio) if self.show_thumbnails and mod.installed else None
+        if thumbnail is not None:
+            size = thumbnail.deviceIndependentSize().toSize()
+            painter.drawPixmap(name_rect.left(), name_rect.top() + (name_rect.height() - size.height()) // 2, thumbnail)
+            name_rect = name_rect.adjusted(THUMBNAIL_SIZE + COLUMN_SPACING, 0, 0, 0)
+        painter.drawText(name_rect, align, metrics.elidedText(mod.name, Qt.TextElideMode.ElideRight, name_rect.width()))
+        id_width = MOD_ID_WIDTH - BUTTON_WIDTH if mod.workshop_item_id > 0 else MOD_ID_WIDTH
+        painter.drawText(rects["id"], align, metrics.elidedText(mod.id, Qt.TextElideMode.ElideRight, id_width))
+        painter.restore()
 
         # Enabled checkbox
-        self.checkbox = QCheckBox()
-        self.checkbox.setFixedWidth(40)
-        self.checkbox.setChecked(mod.enabled)
-        self.checkbox.toggled.connect(self.on_checkbox_toggled)
-        layout.addWidget(self.checkbox)
-
-        # Mod name label
-        self.label_name = QLabel(mod.name)
-        self.label_name.setFixedWidth(MOD_ID_WIDTH)
-        layout.addWidget(self.label_name)
-
-        # Mod id
-        id_widget = QWidget()
-        id_widget.setFixedWidth(MOD_ID_WIDTH)
-        id_layout = QHBoxLayout(id_widget)
-        id_layout.setContentsMargins(0, 0, 0, 0)
-        self.label_id = QLabel(mod.id)
-        # self.label_id.setFixedWidth(200)
-        id_layout.addWidget(self.label_id)
-        if self.mod.workshop_item_id > 0:
-            self.steam_button = QPushButton()
-            self.steam_button.setContentsMargins(0, 0, 0, 0)
-            self.steam_button.setIcon(QIcon("data/icons/steam.svg"))
-            self.steam_button.setToolTip("This is a Workshop Item\nClick to open in Steam Workshop")
-            self.steam_button.setFlat(True)
-            self.steam_button.clicked.connect(self.open_steam_page)
-            id_layout.addWidget(self.steam_button)
-        id_layout.insertStretch(-1, 1)
-        layout.addWidget(id_widget)
-
-        # Folder button
-        self.folder_button = QPushButton()
-        self.folder_button.setFixedWidth(40)
-        self.folder_button.setIcon(QIcon("data/icons/folder.svg"))
-        self.folder_button.setToolTip("Open Mod Folder")
-        self.folder_button.setFlat(True)
-        # self.folder_button.setStyleSheet("border: none")
-        self.folder_button.clicked.connect(self.open_folder)
-        layout.addWidget(self.folder_button)
-
-        self.setLayout(layout)
-
-    def on_checkbox_toggled(self):
-        self.checkbox_toggled.emit(self)
-
-    def open_folder(self):
-        folder_path = self.mod.folder
-        if os.path.exists(folder_path):
-            os.startfile(folder_path) if os.name == 'nt' else os.system(f'open "{folder_path}"')
-
-    def open_steam_page(self):
-        steam_url = f"https://steamcommunity.com/sharedfiles/filedetails/?id={self.mod.workshop_item_id}"
-        webbrowser.open(steam_url)
-
-    def update_order_label(self, new_order):
-        self.label_order.setText(new_order)
+        checkbox = QStyleOptionButton()
+        checkbox.rect = self._checkbox_rect(rects, style, widget)
+        checkbox.state = QStyle.StateFlag.State_Enabled | (QStyle.StateFlag.State_On if mod.enabled else QStyle.StateFlag.State_Off)
+        style.drawPrimitive(QStyle.PrimitiveElement.PE_IndicatorCheckBox, checkbox, painter, widget)
+
+        # Steam and folder buttons
+        if mod.workshop_item_id > 0:
+            painter.drawPixmap(self._centered(rects["steam"], ICON_SIZE), pixmap("steam", ICON_SIZE, device_pixel_ratio))
+        painter.drawPixmap(self._centered(rects["folder"], ICON_SIZE), pixmap("folder", ICON_SIZE, device_pixel_ratio))
+
+    def _hit(self, option, index, pos):
+        """Returns which interactive part of a row is at pos, or None."""
+        rects = self.column_rects(option.rect)
+        mod = index.data(MOD_ROLE)
+        if self._checkbox_rect(rects, self._style(option), option.widget).contains(pos):
+            return "checkbox"
+        if mod is not None and mod.workshop_item_id > 0 and rects["steam"].contains(pos):
+            return "steam"
+        if rects["folder"].contains(pos):
+            return "folder"
+        return None
+
+    def editorEvent(self, event, model, option, index):
+        mouse_events = (QEvent.Type.MouseButtonPress, QEvent.Type.MouseButtonRelease, QEvent.Type.MouseButtonDblClick)
+        if event.type() not in mouse_events:
+            return super().editorEvent(event, model, option, index)
+        if event.button() != Qt.MouseButton.LeftButton:
+            return False
+
+        part = self._hit(option, index, event.position().toPoint())
+        if part is None:
+            return False
+        if event.type() != QEvent.Type.MouseButtonRelease:
+            # Swallow presses on buttons so they don't change the selection or start a drag
+            return True
+
+        mod = index.data(MOD_ROLE)
+        if part == "checkbox":
+            state = Qt.CheckState.Unchecked if mod.enabled else Qt.CheckState.Checked
+            model.setData(index, state, Qt.ItemDataRole.CheckStateRole)
+        elif part == "steam":
+            open_steam_page(mod)
+        elif part == "folder":
+            open_folder(mod)
+        return True
+
+    def helpEvent(self, event, view, option, index):
+        part = self._hit(option, index, event.pos())
+        if part == "steam":
+            QToolTip.showText(event.globalPos(), "This is a Workshop Item\nClick to open in Steam Workshop", view)
+            return True
+        if part == "folder":
+            QToolTip.showText(event.globalPos(), "Open Mod Folder", view)
+            return True
+        return super().helpEvent(event, view, option, index)
 
 
 class HeaderWidget(QWidget):
     def __init__(self):
         super().__init__()
         layout = QHBoxLayout(self)
-        layout.setContentsMargins(21, 0, 0, 0)
+        layout.setContentsMargins(HEADER_MARGIN, 0, 0, 0)
+        layout.setSpacing(COLUMN_SPACING)
 
         # Create labels with stretches applied
         order = QLabel("#")
-        order.setFixedWidth(20)
+        order.setFixedWidth(ORDER_WIDTH)
         layout.addWidget(order)
 
         enabled = QLabel("Enabled")
-        enabled.setFixedWidth(70)
+        enabled.setFixedWidth(ENABLED_WIDTH)
         layout.addWidget(enabled)
 
         mod_name = QLabel("Mod Name")
@@ -112,44 +382,82 @@ class HeaderWidget(QWidget):
         self.setLayout(layout)
 
 
-class ModListWidget(QListWidget):
+class ModListWidget(QListView):
     def __init__(self):
         super().__init__()
         self.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Expanding)
-        self.setSelectionMode(QListWidget.SelectionMode.ExtendedSelection)
-        self.setDragDropMode(QListWidget.DragDropMode.InternalMove)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.setDragDropMode(QAbstractItemView.DragDropMode.InternalMove)
+        self.setDefaultDropAction(Qt.DropAction.MoveAction)
+        self.setUniformItemSizes(True)
+        # Lay rows out in batches, so showing or hiding thousands of rows doesn't freeze the window
+        self.setLayoutMode(QListView.LayoutMode.Batched)
+        self.setBatchSize(500)
+        self.mod_model = ModListModel(self)
+        self.setModel(self.mod_model)
+        self.setItemDelegate(ModItemDelegate(self))
+        self.add_bulk_actions()
         self.read_mods_data()
 
+    def add_bulk_actions(self):
+        """Actions on every selected mod, offered in the context menu and through shortcuts."""
+        self.setContextMenuPolicy(Qt.ContextMenuPolicy.ActionsContextMenu)
+        for text, shortcut, callback in (
+                ("Enable", "Ctrl+E", lambda: self.mod_model.set_enabled(self.selected_rows(), True)),
+                ("Disable", "Ctrl+D", lambda: self.mod_model.set_enabled(self.selected_rows(), False)),
+                ("Invert", "Space", lambda: self.mod_model.set_enabled(self.selected_rows(), None)),
+                ("Move to Top", "Ctrl+Home", lambda: self.move_selected(0)),
+                ("Move to Bottom", "Ctrl+End", lambda: self.move_selected(self.mod_model.rowCount()))):
+            action = QAction(text, self)
+            action.setShortcut(QKeySequence(shortcut))
+            action.setShortcutContext(Qt.ShortcutContext.WidgetShortcut)
+            action.triggered.connect(callback)
+            self.addAction(action)
+
+    def set_editable(self, editable):
+        """Allows or blocks enabling, disabling and moving mods, the list can still be scrolled and searched."""
+        self.mod_model.editable = editable
+        self.setDragDropMode(QAbstractItemView.DragDropMode.InternalMove if editable else QAbstractItemView.DragDropMode.NoDragDrop)
+        for action in self.actions():
+            action.setEnabled(editable)
+
+    def selected_rows(self):
+        """Returns the selected rows in order, leaving out rows hidden by the search."""
+        return sorted(index.row() for index in self.selectionModel().selectedRows() if not self.isRowHidden(index.row()))
+
+    def move_selected(self, destination):
+        rows = self.selected_rows()
+        if rows:
+            self.mod_model.move_rows(rows, destination)
+            self.scrollTo(self.currentIndex())
+
     def read_mods_data(self):
-        self.clear()
-        if helper.shared.mods:
-            for mod in helper.shared.mods:
-                self.add_mod_item(mod)
-
-    def add_mod_item(self, mod):
-        mod_widget = ModItemWidget(mod)
-        mod_widget.checkbox_toggled.connect(self.checkbox_changed)
-        list_item = QListWidgetItem(self)
-        list_item.setSizeHint(mod_widget.sizeHint())
-        self.addItem(list_item)
-        self.setItemWidget(list_item, mod_widget)
-
-    def checkbox_changed(self, mod_widget: ModItemWidget):
-        mod_widget.mod.enabled = mod_widget.checkbox.isChecked()
+        self.mod_model.reset()
+
+    def _drop_row(self, event):
+        """Returns the row a drop should insert before."""
+        index = self.indexAt(event.position().toPoint())
+        position = self.dropIndicatorPosition()
+        if not index.isValid() or position == QAbstractItemView.DropIndicatorPosition.OnViewport:
+            return self.mod_model.rowCount()
+        if position == QAbstractItemView.DropIndicatorPosition.BelowItem:
+            return index.row() + 1
+        return index.row()
 
     def dropEvent(self, event):
-        super().dropEvent(event)
-        self.update_mod_orders()
-
-    def update_mod_orders(self):
-        for index in range(self.count()):
-            list_item = self.item(index)
-            mod_widget = cast(ModItemWidget, self.itemWidget(list_item))
-            if mod_widget is not None:
-                mod_widget.update_order_label(f'{index + 1:03}')
-                mod_widget.mod.order = index
+        if event.source() is not self:
+            event.ignore()
+            return
 
-        helper.shared.mods.sort(key=lambda mod: mod.order)
+        rows = self.selected_rows()
+        destination = self._drop_row(event)
+        # Report a copy so the view doesn't remove the source rows, the model already moved them
+        event.setDropAction(Qt.DropAction.CopyAction)
+        event.accept()
+        self.setState(QAbstractItemView.State.NoState)
+        self.viewport().update()
+        if rows:
+            self.mod_model.move_rows(rows, destination)
 
 
 class ModList(QWidget):
@@ -158,10 +466,12 @@ class ModList(QWidget):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
         layout.setSizeConstraint(QLayout.SizeConstraint.SetMinimumSize)
-        layout.addWidget(HeaderWidget())
         self.mod_list = ModListWidget()
+        self.search_bar = ModSearchBar(self.mod_list)
+        layout.addWidget(self.search_bar)
+        layout.addWidget(HeaderWidget())
         layout.addWidget(self.mod_list)
 
     def adjust_size(self):
-        column_size = self.mod_list.sizeHintForColumn(0)
-        self.mod_list.setMinimumWidth(column_size + 30)
+        # Every row has the same fixed width, no need to measure them
+        self.mod_list.setMinimumWidth(ROW_WIDTH + 30)
@@ -1,42 +1,45 @@
 import os
 from PyQt6.QtWidgets import QFrame, QWidget, QVBoxLayout, QGridLayout, QLineEdit, QPushButton, QFileDialog, QLabel
-from PyQt6.QtCore import pyqtSignal
+from PyQt6.QtCore import QThreadPool, QTimer, pyqtSignal
 import helper.shared
+from gui.gui_worker import PathCheckWorker
+import time
+
+
+# Milliseconds to wait after the last edit before verifying, so several paths set at once are verified together
+VERIFY_DELAY = 300
+# Seconds a path check stays valid, paths are checked again when they are edited after that
+PATH_CACHE_SECONDS = 5
 
 
 class NoitaPathLine(QLineEdit):
-    # Signal emitted when a correct path is set
-    changed_correct = pyqtSignal()
+    # Emitted when the text is set or edited, PathSelectorWidget then verifies all paths together
+    edited = pyqtSignal()
 
     def __init__(self, placeholder, join_part):
         super().__init__()
         self.setPlaceholderText(placeholder)
         self.join_part = join_part
-        self.editingFinished.connect(self.verify)  # Verify on editing finished
+        self.editingFinished.connect(self.edited)
         self.valid = False
 
     def setText(self, a0: str | None) -> None:
-        """Sets the text and verifies the path."""
+        """Sets the text, verifying it is left to PathSelectorWidget."""
         super().setText(a0)
-        self.verify()
+        self.edited.emit()
 
     def getFullPath(self) -> str:
         """Returns the full path, including the joined part."""
         return os.path.join(self.text(), self.join_part)
 
-    def verify(self):
-        """Checks if the full path exists and emits a signal if valid."""
-        if os.path.exists(self.getFullPath()):
-            self.setStyleSheet("")
-            self.valid = True
-            self.changed_correct.emit()  # Path is valid, emit signal
-        else:
-            self.setStyleSheet("color: yellow")  # Path is invalid
-            self.valid = False
+    def set_valid(self, valid):
+        self.valid = valid
+        self.setStyleSheet("" if valid else "color: yellow")
 
 
 class PathSelectorWidget(QWidget):
-    changed_correct = pyqtSignal()
+    # Emitted with whether all paths are valid, once per settled edit that changed a path or its validity
+    validated = pyqtSignal(bool)
 
     def __init__(self):
         super().__init__()
@@ -47,6 +50,15 @@ class PathSelectorWidget(QWidget):
             "noita_save": NoitaPathLine("Example: AppData/LocalLow/Nolla_Games_Noita", "save00"),
             "steam_root": NoitaPathLine("Example: C:/Program Files/Steam", "steamapps")
         }
+        # Full path -> (exists, time checked), and the paths with validity last reported
+        self.checked = {}
+        self.settled = None
+        self.worker = None
+
+        self.verify_timer = QTimer(self)
+        self.verify_timer.setSingleShot(True)
+        self.verify_timer.setInterval(VERIFY_DELAY)
+        self.verify_timer.timeout.connect(self.verify)
         self.update_paths()
 
         # Set up the UI layout
@@ -60,12 +72,47 @@ class PathSelectorWidget(QWidget):
         self.setLayout(layout)
 
     def update_paths(self):
-        """Reads data from data and connect each path's correct signal to save and initialize"""
+        """Reads data from data and verifies the stored paths right away, later edits are verified once they settle"""
         for key, line_widget in self.paths.items():
             stored_path = helper.shared.data.paths[key]
             if stored_path:
                 line_widget.setText(stored_path)
-            line_widget.changed_correct.connect(self.save_and_init)
+            line_widget.edited.connect(self.verify_timer.start)
+        # Once the event loop runs, so the result is reported to everything connected by then
+        QTimer.singleShot(0, self.verify)
+
+    def verify(self):
+        """Verifies all paths together, checking the ones not in the cache on a background thread."""
+        self.verify_timer.stop()
+        now = time.monotonic()
+        full_paths = {line_widget.getFullPath() for line_widget in self.paths.values() if line_widget.text()}
+        unchecked = [path for path in full_paths if path not in self.checked or now - self.checked[path][1] > PATH_CACHE_SECONDS]
+        if not unchecked:
+            self.apply_verified()
+            return
+        # Results of an earlier check still running are stored, but only the latest one is applied
+        worker = self.worker = PathCheckWorker(unchecked)
+        worker.signals.result.connect(lambda results: self.on_checked(worker, results))
+        QThreadPool.globalInstance().start(worker)
+
+    def on_checked(self, worker, results):
+        now = time.monotonic()
+        for path, exists in results.items():
+            self.checked[path] = (exists, now)
+        if worker is self.worker:
+            self.worker = None
+            self.apply_verified()
+
+    def apply_verified(self):
+        """Marks the paths valid or not, and reports if anything changed since the last report."""
+        for line_widget in self.paths.values():
+            checked = self.checked.get(line_widget.getFullPath())
+            line_widget.set_valid(bool(line_widget.text()) and checked is not None and checked[0])
+        state = {key: (line_widget.text(), line_widget.valid) for key, line_widget in self.paths.items()}
+        if state == self.settled:
+            return
+        self.settled = state
+        self.save_and_init()
 
     def add_path_row(self, layout: QGridLayout, label_text: str, line_edit: NoitaPathLine):
         """Adds a row to the layout with label, path line edit, and selection button."""
@@ -85,29 +132,30 @@ class PathSelectorWidget(QWidget):
             line_edit.setText(folder)
 
     def save_and_init(self):
-        """Saves paths to file and reinitializes mod list with new path."""
+        """Saves paths to file and reports the new paths."""
         self.initialize_mod_list()
-        helper.shared.data.write_to_file()
-        if self.are_paths_complete():
-            self.changed_correct.emit()
+        self.validated.emit(self.are_paths_complete())
 
     def are_paths_complete(self) -> bool:
         """Checks if all paths are filled in and verified."""
         return all(line_edit.valid for line_edit in self.paths.values())
 
     def initialize_mod_list(self):
-        """Initialize the mod list with the selected save file path if valid."""
+        """Stores the entered paths that were verified, manager.json is only written if one of them changed.
+
+        A mistyped path keeps the last verified one stored, so the mod list and watcher don't switch to it.
+        """
         for key, line_widget in self.paths.items():
             path = line_widget.text()
-            if path:
+            if line_widget.valid and helper.shared.data.paths[key] != path:
                 helper.shared.data.paths[key] = path
+                helper.shared.data.mark_dirty()
 
 
 class PathSelectorSection(QFrame):
-    def __init__(self, gui_refresh):
+    def __init__(self):
         super().__init__()
         self.setFrameShape(QFrame.Shape.StyledPanel)
-        self.gui_refresh = gui_refresh
 
         # Create layout for the section
         layout = QVBoxLayout(self)
@@ -120,7 +168,7 @@ class PathSelectorSection(QFrame):
         # Path selector widget (initially hidden)
         self.path_selector = PathSelectorWidget()
         self.path_selector.setVisible(False)
-        self.path_selector.changed_correct.connect(self.validate)
+        self.path_selector.validated.connect(self.validate)
 
         # Add button and path selector to layout
         layout.addWidget(self.fold_button)
@@ -128,12 +176,12 @@ class PathSelectorSection(QFrame):
 
         self.init_done = False
 
-    def validate(self):
-        if not self.init_done:
+    def validate(self, complete):
+        """Folds the path selector away once all paths are valid, and keeps it open until then."""
+        if complete and not self.init_done:
             self.init_done = True
             self.fold_button.setChecked(False)
-            self.toggle_path_selector()
-            self.gui_refresh()
+        self.toggle_path_selector()
 
     def toggle_path_selector(self):
         """Toggles the visibility of the path selection section."""
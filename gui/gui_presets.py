@@ -1,10 +1,12 @@
-from PyQt6.QtWidgets import QFrame, QVBoxLayout, QLabel, QPushButton, QLineEdit, QListWidget, QMessageBox
+from PyQt6.QtWidgets import QFrame, QVBoxLayout, QLabel, QPushButton, QLineEdit, QListWidget, QListWidgetItem, QMessageBox, QMenu, QInputDialog, QCheckBox
 from PyQt6.QtCore import Qt, pyqtSignal
 import helper.shared
+import time
 
 
 class SettingsPanel(QFrame):
-    preset_loaded = pyqtSignal()
+    # Emitted with the mods whose enabled state changed
+    preset_loaded = pyqtSignal(object)
 
     def __init__(self):
         super().__init__()
@@ -16,7 +18,10 @@ class SettingsPanel(QFrame):
 
         # Presets list
         self.presets_list = QListWidget()
+        self.presets_list.setSelectionMode(QListWidget.SelectionMode.ExtendedSelection)
         self.presets_list.itemSelectionChanged.connect(self.preset_selected)
+        self.presets_list.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.presets_list.customContextMenuRequested.connect(self.show_context_menu)
         self.update_presets_list()
 
         # Preset name input field
@@ -24,8 +29,13 @@ class SettingsPanel(QFrame):
         self.preset_name_input.textChanged.connect(self.input_text_changed)
         self.preset_name_input.setPlaceholderText("Enter preset name")
 
+        # Mod settings are stored with the preset only when asked for
+        self.include_settings_check = QCheckBox("Include mod settings")
+        self.include_settings_check.setToolTip("Store the settings of the enabled mods with the preset and restore them when loading it")
+
         layout.addWidget(self.preset_name_input)
         layout.addWidget(self.presets_list)
+        layout.addWidget(self.include_settings_check)
 
         self.update_preset_button = QPushButton("Create Preset")
         self.update_preset_button.clicked.connect(self.update_preset)
@@ -35,6 +45,10 @@ class SettingsPanel(QFrame):
         load_preset_button.clicked.connect(self.load_preset)
         layout.addWidget(load_preset_button)
 
+        rename_preset_button = QPushButton("Rename Preset")
+        rename_preset_button.clicked.connect(self.rename_preset)
+        layout.addWidget(rename_preset_button)
+
         delete_preset_button = QPushButton("Delete Preset")
         delete_preset_button.clicked.connect(self.delete_preset)
         layout.addWidget(delete_preset_button)
@@ -60,20 +74,53 @@ class SettingsPanel(QFrame):
         if current_item:
             preset_name = current_item.text()
             self.preset_name_input.setText(preset_name)
+            self.include_settings_check.setChecked(helper.shared.presets.has_settings(preset_name))
 
     def update_presets_list(self):
-        """Update presets list in GUI"""
-        self.presets_list.clear()  # Clear the list to avoid duplicates
+        """Fill the presets list in GUI, later changes update single items."""
+        self.presets_list.clear()
         for preset_name in helper.shared.data.presets:
-            self.presets_list.addItem(preset_name)
+            self.presets_list.addItem(self.create_preset_item(preset_name))
+
+    @staticmethod
+    def create_preset_item(preset_name):
+        item = QListWidgetItem(preset_name)
+        SettingsPanel.update_preset_tooltip(item)
+        return item
+
+    @staticmethod
+    def update_preset_tooltip(item):
+        """Show when a preset was created and last changed, if the preset store keeps track of it, and if it has mod settings."""
+        lines = []
+        timestamps = helper.shared.presets.timestamps(item.text())
+        if timestamps:
+            created, modified = (time.strftime("%Y-%m-%d %H:%M", time.localtime(timestamp)) for timestamp in timestamps)
+            lines += [f"Created {created}", f"Modified {modified}"]
+        if helper.shared.presets.has_settings(item.text()):
+            lines.append("Includes mod settings")
+        item.setToolTip("\n".join(lines))
+
+    def preset_item(self, preset_name):
+        """Returns the list item of a preset, adding it if the preset is new."""
+        items = self.presets_list.findItems(preset_name, Qt.MatchFlag.MatchExactly)
+        if items:
+            self.update_preset_tooltip(items[0])
+            return items[0]
+        item = self.create_preset_item(preset_name)
+        self.presets_list.addItem(item)
+        return item
 
     def save_preset(self, preset_name):
         """Save the current enabled mods to the specified preset."""
-        enabled_mods = [mod._uid for mod in helper.shared.mods if mod.enabled]
-        helper.shared.data.presets[preset_name] = enabled_mods
-        helper.shared.data.write_to_file()
-        self.update_presets_list()
-        self.presets_list.setCurrentItem(self.presets_list.findItems(preset_name, Qt.MatchFlag.MatchExactly)[0])
+        helper.shared.presets.save(preset_name, helper.shared.mods)
+        try:
+            if self.include_settings_check.isChecked():
+                helper.shared.presets.save_settings(preset_name, helper.shared.mods, helper.shared.mods.mod_settings)
+            else:
+                helper.shared.presets.delete_settings(preset_name)
+        except OSError as error:
+            QMessageBox.warning(self, "Error", f"Couldn't store the mod settings of '{preset_name}': {error.strerror}")
+        self.presets_list.setCurrentItem(self.preset_item(preset_name))
         print(f"Preset '{preset_name}' saved.")
 
     def update_preset(self):
@@ -95,15 +142,26 @@ class SettingsPanel(QFrame):
             return
 
         selected_preset_name = current_item.text()
-        preset_mods = helper.shared.data.presets[selected_preset_name]
+        changes = helper.shared.presets.preview(selected_preset_name, helper.shared.mods)
+        has_settings = helper.shared.presets.has_settings(selected_preset_name)
+        if not changes and not changes.missing and not has_settings:
+            return
 
-        for mod in helper.shared.mods:
-            if mod._uid in preset_mods:
-                mod.enabled = True
-            else:
-                mod.enabled = False
+        summary = changes.summary() + ("\nRestore the stored settings of its mods." if has_settings else "")
+        response = QMessageBox.question(self, "Confirm Load", f"Loading '{selected_preset_name}' will:\n{summary}\n\nContinue?")
+        if response != QMessageBox.StandardButton.Yes:
+            return
 
-        self.preset_loaded.emit()
+        changed = helper.shared.presets.apply(selected_preset_name, helper.shared.mods)
+        if has_settings:
+            try:
+                restored = helper.shared.presets.apply_settings(selected_preset_name, helper.shared.mods.mod_settings)
+                print(f"Restored settings of {restored} mod(s).")
+            except OSError as error:
+                QMessageBox.warning(self, "Error", f"Couldn't restore the mod settings of '{selected_preset_name}': {error.strerror}")
+            except ValueError as error:
+                QMessageBox.warning(self, "Error", str(error))
+        self.preset_loaded.emit(changed)
 
     def delete_preset(self):
         """Delete the selected preset."""
@@ -112,6 +170,61 @@ class SettingsPanel(QFrame):
             return
 
         selected_preset_name = current_item.text()
-        del helper.shared.data.presets[selected_preset_name]
-        helper.shared.data.write_to_file()
-        self.update_presets_list()
+        helper.shared.presets.delete(selected_preset_name)
+        self.presets_list.takeItem(self.presets_list.row(current_item))
+
+    def rename_preset(self):
+        """Rename the selected preset."""
+        current_item = self.presets_list.currentItem()
+        if not current_item:
+            QMessageBox.warning(self, "Error", "Please select a preset to rename.")
+            return
+
+        preset_name = current_item.text()
+        new_name, accepted = QInputDialog.getText(self, "Rename Preset", "New name:", text=preset_name)
+        new_name = new_name.strip()
+        if not accepted or not new_name or new_name == preset_name:
+            return
+        try:
+            helper.shared.presets.rename(preset_name, new_name)
+        except ValueError as error:
+            QMessageBox.warning(self, "Error", str(error))
+            return
+        current_item.setText(new_name)
+        self.update_preset_tooltip(current_item)
+        self.preset_name_input.setText(new_name)
+
+    def show_context_menu(self, position):
+        """Offers comparing and combining presets when two or more are selected."""
+        names = [item.text() for item in self.presets_list.selectedItems()]
+        if len(names) < 2:
+            return
+
+        menu = QMenu(self)
+        compare_action = menu.addAction("Compare") if len(names) == 2 else None
+        union_action = menu.addAction("Create Union Preset")
+        intersection_action = menu.addAction("Create Intersection Preset")
+        action = menu.exec(self.presets_list.viewport().mapToGlobal(position))
+
+        if action is None:
+            return
+        if action == compare_action:
+            self.compare_presets(*names)
+        elif action == union_action:
+            self.create_combined_preset(" + ".join(names), helper.shared.presets.union(names))
+        elif action == intersection_action:
+            self.create_combined_preset(" & ".join(names), helper.shared.presets.intersection(names))
+
+    def compare_presets(self, first, second):
+        only_first, only_second = helper.shared.presets.diff(first, second)
+        lines = [f"Only in '{first}' ({len(only_first)}):"] + only_first[:20]
+        lines += ["", f"Only in '{second}' ({len(only_second)}):"] + only_second[:20]
+        QMessageBox.information(self, "Compare Presets", "\n".join(lines))
+
+    def create_combined_preset(self, preset_name, uids):
+        if preset_name in helper.shared.data.presets:
+            response = QMessageBox.question(self, "Confirm Update", f"The preset '{preset_name}' already exists. Do you want to overwrite it?")
+            if response != QMessageBox.StandardButton.Yes:
+                return
+        helper.shared.presets.store(preset_name, uids)
+        self.preset_item(preset_name)
@@ -0,0 +1,119 @@
+from PyQt6.QtWidgets import QWidget, QHBoxLayout, QLineEdit, QCheckBox, QLabel
+from PyQt6.QtCore import QTimer
+import helper.shared
+from helper.search import ModSearchIndex
+from helper.trace import traced
+
+# Milliseconds to wait after the last keystroke or list change before filtering
+SEARCH_DELAY = 150
+# Rows shown or hidden per event loop pass, so filtering thousands of rows never blocks for more than a frame
+ROWS_PER_PASS = 1000
+
+
+class ModSearchBar(QWidget):
+    """Search box and filters hiding non-matching rows of a ModListWidget, rows are never rebuilt."""
+
+    def __init__(self, mod_list):
+        super().__init__()
+        self.mod_list = mod_list
+        self.index = ModSearchIndex()
+        # The index is only built once a search needs it, so filling the list never waits for it
+        self.index_stale = True
+        # UIDs of hidden mods, mirrors the view's hidden rows which follow their mods through moves
+        self.hidden = set()
+        self.pending = []
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search by name, id or workshop id")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_input.textChanged.connect(self.schedule)
+        layout.addWidget(self.search_input)
+
+        # Filter name in helper.search.FILTERS -> checkbox
+        self.filter_boxes = {}
+        for name, label in (("enabled", "Enabled"), ("workshop", "Workshop"), ("missing", "Missing folder")):
+            box = QCheckBox(label)
+            box.toggled.connect(lambda checked: self.apply_filter())
+            layout.addWidget(box)
+            self.filter_boxes[name] = box
+
+        self.count_label = QLabel()
+        layout.addWidget(self.count_label)
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(SEARCH_DELAY)
+        self.timer.timeout.connect(self.apply_filter)
+        self.pass_timer = QTimer(self)
+        self.pass_timer.setInterval(0)
+        self.pass_timer.timeout.connect(self.apply_pass)
+
+        # Keep the index in step with the model, only touching the rows that changed
+        model = mod_list.mod_model
+        model.modelReset.connect(self.rebuild_index)
+        model.rowsInserted.connect(lambda parent, first, last: self.update_rows(first, last))
+        model.rowsAboutToBeRemoved.connect(self.remove_rows)
+        model.dataChanged.connect(lambda top_left, bottom_right, *roles: self.update_rows(top_left.row(), bottom_right.row()))
+        model.rowsMoved.connect(self.schedule)
+        model.layoutChanged.connect(self.schedule)
+        self.rebuild_index()
+
+    def rebuild_index(self):
+        # A reset shows every row again
+        self.hidden.clear()
+        self.index_stale = True
+        self.schedule()
+
+    def update_rows(self, first, last):
+        if not self.index_stale:
+            mods = helper.shared.mods
+            for row in range(first, last + 1):
+                self.index.update(mods[row])
+        self.schedule()
+
+    def remove_rows(self, parent, first, last):
+        if not self.index_stale:
+            mods = helper.shared.mods
+            for row in range(first, last + 1):
+                self.index.remove(mods[row]._uid)
+        self.schedule()
+
+    def schedule(self):
+        """Filters once typing or a burst of list changes has settled, pending rows may have moved so they're dropped."""
+        self.pass_timer.stop()
+        self.pending = []
+        self.timer.start()
+
+    def active_filters(self):
+        return [name for name, box in self.filter_boxes.items() if box.isChecked()]
+
+    @traced("filter mod list")
+    def apply_filter(self):
+        """Finds the rows whose visibility changes, they are then updated a few thousand per event loop pass."""
+        self.timer.stop()
+        mods = helper.shared.mods
+        query = self.search_input.text()
+        if self.index_stale and query.strip():
+            self.index.rebuild(mods)
+            self.index_stale = False
+        matches = self.index.matches(mods, query, self.active_filters())
+        hidden = self.hidden
+        self.pending = [(row, mod._uid, visible) for row, (mod, visible) in enumerate(zip(mods, matches)) if (mod._uid in hidden) == visible]
+        shown = sum(matches)
+        self.count_label.setText(f"{shown} of {len(mods)} mods" if shown < len(mods) else f"{len(mods)} mods")
+        if self.pending:
+            self.pass_timer.start()
+
+    def apply_pass(self):
+        batch, self.pending = self.pending[:ROWS_PER_PASS], self.pending[ROWS_PER_PASS:]
+        for row, uid, visible in batch:
+            self.mod_list.setRowHidden(row, not visible)
+            if visible:
+                self.hidden.discard(uid)
+            else:
+                self.hidden.add(uid)
+        if not self.pending:
+            self.pass_timer.stop()
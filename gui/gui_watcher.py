@@ -0,0 +1,56 @@
+import os
+from PyQt6.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+from helper.index import ModDirectoryIndex
+from helper.vdf import workshop_manifest_path
+import helper.shared
+
+# Milliseconds without further events before a change is reported, a Steam update touches many files at once
+DEBOUNCE_DELAY = 1000
+
+
+class ModFilesWatcher(QObject):
+    """Watches mod folders and mod_config.xml, emitting changed once per burst of filesystem events.
+
+    QFileSystemWatcher uses inotify or the platform's native API and falls back to polling where none is available.
+    """
+    changed = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.schedule)
+        self.watcher.fileChanged.connect(self.file_changed)
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(DEBOUNCE_DELAY)
+        self.timer.timeout.connect(self.changed)
+
+    @staticmethod
+    def watched_paths():
+        paths = helper.shared.data.paths
+        return [
+            ModDirectoryIndex.workshop_content_path(paths.get("steam_root", "")),
+            workshop_manifest_path(paths.get("steam_root", "")),
+            ModDirectoryIndex.local_mods_path(paths.get("noita_root", "")),
+            helper.shared.mods.mod_config_path(),
+        ]
+
+    def watch(self):
+        """(Re)starts watching the paths from the current path configuration."""
+        watched = self.watcher.files() + self.watcher.directories()
+        if watched:
+            self.watcher.removePaths(watched)
+        existing = [path for path in self.watched_paths() if os.path.exists(path)]
+        if existing:
+            self.watcher.addPaths(existing)
+
+    def file_changed(self, path):
+        # Files replaced through a rename stop being watched, so watch the new file again
+        if path not in self.watcher.files() and os.path.exists(path):
+            self.watcher.addPath(path)
+        self.schedule()
+
+    def schedule(self):
+        """Restarts the debounce delay."""
+        self.timer.start()
@@ -0,0 +1,137 @@
+import os
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+import helper.shared
+from helper.trace import span
+
+_mod_data_pool = None
+
+
+def mod_data_pool() -> QThreadPool:
+    """Returns the pool mod data jobs run on, it has a single thread so reads and writes never overlap."""
+    global _mod_data_pool
+    if _mod_data_pool is None:
+        _mod_data_pool = QThreadPool()
+        _mod_data_pool.setMaxThreadCount(1)
+    return _mod_data_pool
+
+
+class WorkerSignals(QObject):
+    started = pyqtSignal()
+    progress = pyqtSignal(int, int)
+    chunk = pyqtSignal(object)
+    result = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    # Emitted with False if the job was cancelled or failed
+    finished = pyqtSignal(bool)
+
+
+class ModDataWorker(QRunnable):
+    """Base for jobs reading or writing mod data off the GUI thread, results are delivered through signals."""
+
+    def __init__(self):
+        super().__init__()
+        self.signals = WorkerSignals()
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def work(self) -> bool:
+        raise NotImplementedError
+
+    def run(self):
+        self.signals.started.emit()
+        try:
+            with span(type(self).__name__):
+                completed = self.work()
+        except Exception as error:
+            # Report to the GUI instead of silently killing the pool thread
+            self.signals.failed.emit(str(error))
+            completed = False
+        self.signals.finished.emit(completed)
+
+
+class ReadModDataWorker(ModDataWorker):
+    """Reads mod and config data, emitting resolved mods in chunks as they become available."""
+
+    def work(self):
+        chunks = helper.shared.mods.iter_read()
+        mods = []
+        try:
+            for chunk, total in chunks:
+                if self.cancelled:
+                    return False
+                mods.extend(chunk)
+                self.signals.chunk.emit(chunk)
+                self.signals.progress.emit(len(mods), total)
+        finally:
+            chunks.close()
+
+        helper.shared.config.read_xml()
+        helper.shared.mods.save_snapshot(mods)
+        return True
+
+
+class RefreshModDataWorker(ModDataWorker):
+    """Rereads mod data from disk into new objects, emitting (mods, mod_config.xml changed) for the GUI to merge.
+
+    With read_config the config is read too, for when the mod list was only shown from a snapshot so far.
+    """
+
+    def __init__(self, read_config=False):
+        super().__init__()
+        self.read_config = read_config
+
+    def work(self):
+        mods, config_changed = helper.shared.mods.read_changes()
+        self.signals.result.emit((mods, config_changed))
+        if self.read_config:
+            helper.shared.config.read_xml()
+        helper.shared.mods.save_snapshot(mods)
+        return True
+
+
+class ConflictScanWorker(ModDataWorker):
+    """Brings the conflict index up to date for a snapshot of the mod list, emitting the number of mods scanned."""
+
+    def __init__(self, mods, hash_files=False, force=False):
+        super().__init__()
+        self.mods = mods
+        self.hash_files = hash_files
+        self.force = force
+
+    def work(self):
+        self.signals.progress.emit(0, 0)
+        conflicts = helper.shared.conflicts
+        scanned = conflicts.scan(self.mods, helper.shared.mods.workshop_items, helper.shared.data.settings["read_workers"], self.hash_files, self.force)
+        conflicts.write_to_file()
+        self.signals.result.emit(scanned)
+        return True
+
+
+class WriteModDataWorker(ModDataWorker):
+    """Writes a snapshot of the mod list and the config back to file."""
+
+    def __init__(self, mods, label="Saved"):
+        super().__init__()
+        self.mods = mods
+        self.label = label
+
+    def work(self):
+        self.signals.progress.emit(0, 0)
+        helper.shared.mods.write_back(self.mods, self.label)
+        helper.shared.config.write_back()
+        helper.shared.mods.save_snapshot(self.mods)
+        return True
+
+
+class PathCheckWorker(ModDataWorker):
+    """Checks which of the given paths exist, emitting {path: exists}, so slow network drives never block the GUI."""
+
+    def __init__(self, paths):
+        super().__init__()
+        self.paths = paths
+
+    def work(self):
+        self.signals.result.emit({path: os.path.exists(path) for path in self.paths})
+        return True
@@ -0,0 +1,81 @@
+import os
+import json
+import threading
+from helper.fileio import atomic_write
+
+
+class ModMetadataCache():
+    """Persistent cache of parsed mod.xml metadata, keyed by file path and validated by a signature."""
+
+    def __init__(self, cache_file_path="mod_cache.json", max_entries=10000):
+        self._cache_file_path = cache_file_path
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self.read_file()
+
+    @staticmethod
+    def stat_signature(path):
+        """Returns the [mtime, size] signature of a file, or None if it doesn't exist."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def read_file(self):
+        """Reads cached entries from file, starting with an empty cache if it's missing or corrupt."""
+        self._entries = {}
+        if not os.path.exists(self._cache_file_path):
+            return
+        try:
+            with open(self._cache_file_path, "r") as file:
+                self._entries = json.load(file).get("entries", {})
+        except (json.JSONDecodeError, AttributeError):
+            print(f"Couldn\'t parse {self._cache_file_path}, starting with an empty cache.")
+
+    def reset_stats(self):
+        """Resets hit and miss counters, called at the start of every read."""
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, path, signature):
+        """Returns cached metadata for path if its signature still matches, otherwise None."""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry["signature"] != signature:
+                if entry is not None:
+                    # The file changed since it was cached, the entry is stale
+                    del self._entries[path]
+                    self._dirty = True
+                self.misses += 1
+                return None
+            # Move to the end so least recently used entries get evicted first
+            self._entries[path] = self._entries.pop(path)
+            self.hits += 1
+            return entry["metadata"]
+
+    def store(self, path, signature, metadata):
+        """Stores metadata for path, evicting the least recently used entries above max_entries."""
+        with self._lock:
+            self._entries.pop(path, None)
+            self._entries[path] = {"signature": signature, "metadata": metadata}
+            while len(self._entries) > self.max_entries:
+                del self._entries[next(iter(self._entries))]
+            self._dirty = True
+
+    def write_to_file(self):
+        """Writes the cache to file if anything changed since it was last read or written."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"stats": {"hits": self.hits, "misses": self.misses}, "entries": dict(self._entries)}
+            self._dirty = False
+        try:
+            # Several reads can finish at the same time, an atomic replace keeps their writes from interleaving
+            atomic_write(self._cache_file_path, json.dumps(data).encode("utf-8"))
+        except OSError as error:
+            print(f"Couldn\'t write {self._cache_file_path}: {error.strerror}.")
@@ -1,27 +1,60 @@
 import os
-import xml.etree.ElementTree as ET
+import re
 import helper.shared
+from helper.fileio import atomic_write
+from helper.trace import traced
+
+# The first start tag that isn't an XML declaration or comment is the root element
+ROOT_TAG = re.compile(rb'<(?![?!])[^>]*>')
+SANDBOX_ATTRIBUTE = re.compile(rb'(\smods_sandbox_enabled=")[^"]*(")')
 
 
 class NoitaConfig(list):
-    def __init__(self):
+    def __init__(self, paths=None):
+        """Without explicit paths the ones configured in helper.shared.data are used."""
         super().__init__()
+        self._paths = paths
+        self.config = ""
+        self._loaded = b""
+        self._patched = b""
 
     def read_xml(self):
-        """Load mod data from the XML file specified in save path."""
+        """Load config from the XML file specified in save path and disable the mod sandbox in it."""
         self.clear()
-        self.config = os.path.join(helper.shared.data.paths.get("noita_save", ""), "save_shared", "config.xml")
+        self._loaded = self._patched = b""
+        paths = self._paths if self._paths is not None else helper.shared.data.paths
+        self.config = os.path.join(paths.get("noita_save", ""), "save_shared", "config.xml")
 
         if not self.config or not os.path.exists(self.config):
             print(f"Warning: Config path '{self.config}' does not exist.")
             return
 
-        # Parse XML and instantiate mod data objects
-        self.tree = ET.parse(self.config)
-        ET.indent(self.tree, space='\n  ', level=0)
-        root = self.tree.getroot()
-        root.attrib["mods_sandbox_enabled"] = "0"
+        with open(self.config, "rb") as file:
+            self._loaded = file.read()
+        self._patched = self._disable_sandbox(self._loaded)
+
+    @staticmethod
+    def _disable_sandbox(content):
+        """Set mods_sandbox_enabled="0" on the root element, leaving every other byte untouched."""
+        match = ROOT_TAG.search(content)
+        if not match:
+            return content
+
+        tag = match.group(0)
+        new_tag, count = SANDBOX_ATTRIBUTE.subn(rb'\g<1>0\g<2>', tag, count=1)
+        if not count:
+            end = -2 if tag.endswith(b"/>") else -1
+            new_tag = tag[:end].rstrip() + b' mods_sandbox_enabled="0"' + tag[end:]
+        return content[:match.start()] + new_tag + content[match.end():]
 
+    @traced("write config.xml")
     def write_back(self):
-        if self.tree:
-            self.tree.write(self.config)
+        """Write the config back to file, skipped if the sandbox was already disabled."""
+        if self._patched == self._loaded:
+            return
+
+        try:
+            atomic_write(self.config, self._patched)
+            self._loaded = self._patched
+        except OSError as error:
+            print(f"Error: Couldn't write '{self.config}': {error.strerror}.")
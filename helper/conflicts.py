@@ -0,0 +1,158 @@
+import os
+import json
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from helper.fileio import atomic_write
+from helper.trace import span, traced
+
+# Only files under a mod's data folder override the game's or other mods' files
+OVERRIDE_FOLDER = "data"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class FileConflict:
+    """A file several enabled mods provide, the last of them in load order wins."""
+
+    def __init__(self, path, mods, hashes=None):
+        self.path = path
+        self.mods = mods
+        self.hashes = hashes
+
+    @property
+    def winner(self):
+        return self.mods[-1]
+
+    @property
+    def identical(self):
+        """True if every mod ships the same content, None if contents weren't hashed."""
+        if self.hashes is None or None in self.hashes:
+            return None
+        return len(set(self.hashes)) == 1
+
+
+class ConflictIndex():
+    """Files each mod overrides, used to find mods that override the same files.
+
+    Scanned file lists are cached by a signature of the mod folder: Steam's timeupdated and size for workshop items,
+    the folder's modification time otherwise. Only mods whose signature changed are scanned again.
+    """
+
+    def __init__(self, cache_file_path="conflict_cache.json"):
+        self._cache_file_path = cache_file_path
+        # folder -> {"signature": [...], "hashed": bool, "files": {relative path: hash or None}}
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.read_file()
+
+    def read_file(self):
+        """Reads cached file lists, starting with an empty index if the cache is missing or corrupt."""
+        self._entries = {}
+        if not os.path.exists(self._cache_file_path):
+            return
+        try:
+            with open(self._cache_file_path, "r") as file:
+                self._entries = json.load(file)
+        except (json.JSONDecodeError, AttributeError):
+            print(f"Couldn\'t parse {self._cache_file_path}, starting with an empty conflict index.")
+
+    def write_to_file(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            content = json.dumps(self._entries)
+            self._dirty = False
+        try:
+            atomic_write(self._cache_file_path, content.encode("utf-8"))
+        except OSError as error:
+            print(f"Couldn\'t write {self._cache_file_path}: {error.strerror}.")
+
+    @staticmethod
+    def folder_signature(mod, workshop_items):
+        """Returns the signature the cached file list of a mod is validated by, or None if its folder is missing."""
+        workshop_item = workshop_items.get(mod.workshop_item_id) if mod.workshop_item_id > 0 else None
+        if workshop_item is not None:
+            return ["acf", workshop_item.time_updated, workshop_item.size]
+        try:
+            return [os.stat(mod.folder).st_mtime_ns]
+        except OSError:
+            return None
+
+    @staticmethod
+    def _hash(path):
+        digest = hashlib.blake2b(digest_size=16)
+        try:
+            with open(path, "rb") as file:
+                while chunk := file.read(HASH_CHUNK_SIZE):
+                    digest.update(chunk)
+        except OSError:
+            return None
+        return digest.hexdigest()
+
+    @classmethod
+    def _scan_folder(cls, folder, hash_files):
+        """Returns {path relative to the mod folder: content hash or None} for every file under its data folder."""
+        files = {}
+        for root, _, names in os.walk(os.path.join(folder, OVERRIDE_FOLDER)):
+            relative_root = os.path.relpath(root, folder).replace(os.sep, "/")
+            for name in names:
+                files[f"{relative_root}/{name}"] = cls._hash(os.path.join(root, name)) if hash_files else None
+        return files
+
+    @traced("scan mod files")
+    def scan(self, mods, workshop_items=None, workers=8, hash_files=False, force=False):
+        """Brings the file lists of the given mods up to date, scanning changed folders in parallel.
+
+        Returns the number of mods that were scanned.
+        """
+        workshop_items = workshop_items or {}
+        stale = []
+        for mod in mods:
+            if not mod.installed:
+                continue
+            signature = self.folder_signature(mod, workshop_items)
+            entry = self._entries.get(mod.folder)
+            if force or entry is None or entry["signature"] != signature or (hash_files and not entry["hashed"]):
+                stale.append((mod.folder, signature))
+
+        def scan_folder(stale_folder):
+            folder, signature = stale_folder
+            with span("scan mod folder", folder=folder):
+                return folder, {"signature": signature, "hashed": hash_files, "files": self._scan_folder(folder, hash_files)}
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for folder, entry in executor.map(scan_folder, stale):
+                with self._lock:
+                    self._entries[folder] = entry
+                    self._dirty = True
+        return len(stale)
+
+    def files(self, mod):
+        """Returns {relative path: hash or None} of the files a mod overrides, empty if it wasn't scanned."""
+        entry = self._entries.get(mod.folder)
+        return entry["files"] if entry is not None else {}
+
+    @traced("find conflicts")
+    def conflicts(self, mods):
+        """Returns the files more than one enabled mod provides, mods listed in load order."""
+        providers = {}
+        for mod in mods:
+            if mod.enabled:
+                for path, file_hash in self.files(mod).items():
+                    providers.setdefault(path, []).append((mod, file_hash))
+
+        conflicts = []
+        for path in sorted(providers):
+            provided = providers[path]
+            if len(provided) > 1:
+                conflicts.append(FileConflict(path, [mod for mod, _ in provided], [file_hash for _, file_hash in provided]))
+        return conflicts
+
+    def conflicts_by_mod(self, mods):
+        """Returns {mod UID: [FileConflict, ...]} for every enabled mod sharing files with another one."""
+        by_mod = {}
+        for conflict in self.conflicts(mods):
+            for mod in conflict.mods:
+                by_mod.setdefault(mod._uid, []).append(conflict)
+        return by_mod
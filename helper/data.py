@@ -1,7 +1,17 @@
 import os
 import json
+import atexit
+import threading
+from helper.fileio import atomic_write
+from helper.trace import traced
+from helper.preset_store import SqlitePresetStore
 
 DEFAULT_PATH = {"noita_root": "", "noita_save": "", "steam_root": ""}
+DEFAULT_SETTINGS = {"read_workers": 8, "preview_thumbnails": False, "thumbnail_cache_mb": 32, "preset_store": "json", "history": True}
+# Database file of the optional SQLite preset store, next to the manager file
+PRESET_DATABASE = "presets.db"
+# Seconds to wait after the last change before writing, so bursts of changes end up in one write
+WRITE_DELAY = 0.5
 
 
 class ModManagerData():
@@ -9,7 +19,16 @@ class ModManagerData():
         self._manager_file_path = "manager.json"
         self.presets = {}
         self.paths = {}
+        self.settings = {}
+        self.profiles = {}
+        # Presets of the manager file that couldn't be moved to the SQLite store, kept in the file
+        self.unmigrated_presets = {}
+        self._lock = threading.RLock()
+        self._timer = None
+        self._dirty = False
+        self._written = None
         self.read_file()
+        atexit.register(self.write_to_file)
 
     def _read_data_from_file(self):
         """Reads JSON data from manager file and initializes _data with default values if empty or corrupt."""
@@ -25,6 +44,8 @@ class ModManagerData():
         """Sets default values for paths and presets if not present in _data."""
         self.presets = self._data.get("presets", {})
         self.paths = self._data.get("paths", DEFAULT_PATH.copy())
+        self.settings = self._data.get("settings", DEFAULT_SETTINGS.copy())
+        self.profiles = self._data.get("profiles", {})
 
     def _update_from_data(self):
         self._set_defaults()
@@ -34,16 +55,84 @@ class ModManagerData():
         for path in DEFAULT_PATH:
             if not path in self.paths:
                 self.paths[path] = ""
+        for setting, value in DEFAULT_SETTINGS.items():
+            self.settings.setdefault(setting, value)
 
     def read_file(self):
         self._read_data_from_file()
         self._update_from_data()
         self._verify_path()
+        self._written = self._serialize()
+        self._dirty = False
+        self._open_preset_store()
 
-    def write_to_file(self):
-        """Writes the current data to file with verification of necessary keys."""
-        self._data["presets"] = self.presets
+    def _open_preset_store(self):
+        """Switches presets to the SQLite store if the preset_store setting asks for it.
+
+        Presets still in the manager file are moved into the store once, and dropped from the file on the next write.
+        Presets whose name is already taken in the store stay in the file so neither version is lost.
+        """
+        self.unmigrated_presets = {}
+        if self.settings["preset_store"] != "sqlite":
+            return
+        store = SqlitePresetStore(os.path.join(os.path.dirname(self._manager_file_path), PRESET_DATABASE))
+        if self.presets:
+            migrated = set(store.migrate(self.presets))
+            self.unmigrated_presets = {name: uids for name, uids in self.presets.items() if name not in migrated}
+            if migrated:
+                print(f"Moved {len(migrated)} preset(s) from {self._manager_file_path} to {store.database_path}.")
+                self.mark_dirty()
+            if self.unmigrated_presets:
+                print(f"Warning: {store.database_path} already has preset(s) named {', '.join(self.unmigrated_presets)}, "
+                      f"they are kept in {self._manager_file_path} and moved once the name is free.")
+        self.presets = store
+
+    def _serialize(self) -> str:
+        if isinstance(self.presets, dict):
+            self._data["presets"] = self.presets
+        elif self.unmigrated_presets:
+            # Presets live in the SQLite store, except for ones whose name was already taken there
+            self._data["presets"] = self.unmigrated_presets
+        else:
+            self._data.pop("presets", None)
         self._data["paths"] = self.paths
-        with open(self._manager_file_path, "w") as file:
-            json.dump(self._data, file, indent=4)
+        self._data["settings"] = self.settings
+        self._data["profiles"] = self.profiles
+        return json.dumps(self._data, indent=4)
+
+    def mark_dirty(self):
+        """Flags data as changed and schedules a write, restarting the delay on every call."""
+        with self._lock:
+            self._dirty = True
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(WRITE_DELAY, self.write_to_file)
+            self._timer.daemon = True
+            self._timer.start()
+
+    @traced("write manager.json")
+    def write_to_file(self):
+        """Writes pending changes to file now, skipped if nothing changed since the last read or write."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            try:
+                content = self._serialize()
+            except RuntimeError:
+                # Data was modified while being serialized, try again once it settles
+                self.mark_dirty()
+                return
+            self._dirty = False
+            if content == self._written:
+                return
+            try:
+                atomic_write(self._manager_file_path, content.encode("utf-8"))
+            except OSError as error:
+                self._dirty = True
+                print(f"Couldn't write {self._manager_file_path}: {error.strerror}.")
+                return
+            self._written = content
         print(f"Data written to {self._manager_file_path}.")
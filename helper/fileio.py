@@ -0,0 +1,23 @@
+import os
+import tempfile
+
+
+def atomic_write(path, data: bytes):
+    """Writes data to path through a temporary file in the same folder, so a crash never leaves it truncated."""
+    folder = os.path.dirname(os.path.abspath(path))
+    descriptor, temp_path = tempfile.mkstemp(dir=folder, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        if os.path.exists(path):
+            # mkstemp creates private files, keep the permissions of the file being replaced
+            os.chmod(temp_path, os.stat(path).st_mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
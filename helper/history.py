@@ -0,0 +1,179 @@
+"""Snapshot history of mod_config.xml writes, stored as delta-encoded JSON lines.
+
+Each snapshot is the load order with enabled flags. Most are stored as a delta against the snapshot before:
+runs of positions taken over from the previous order, UIDs of mods that are new, and the positions whose
+enabled flag flipped. Every KEYFRAME_INTERVAL snapshots a full keyframe is stored, so restoring any snapshot
+decodes at most that many records no matter how long the history gets.
+"""
+import bisect
+import hashlib
+import json
+import os
+import threading
+import time
+from helper.trace import traced
+
+HISTORY_DIR = "history"
+KEYFRAME_INTERVAL = 50
+
+
+class Snapshot:
+    """Summary of a recorded snapshot, the state itself is decoded on demand by ModConfigHistory.state()."""
+
+    def __init__(self, snapshot_id, timestamp, label, mod_count, enabled_count):
+        self.id = snapshot_id
+        self.time = timestamp
+        self.label = label
+        self.mod_count = mod_count
+        self.enabled_count = enabled_count
+
+    def __str__(self):
+        when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.time))
+        return f"#{self.id} {when} {self.label} ({self.enabled_count}/{self.mod_count} enabled)"
+
+
+def encode_delta(previous, state):
+    """Encodes state, a list of (uid, enabled), as runs over the previous state plus flipped positions."""
+    previous_positions = {uid: position for position, (uid, _) in enumerate(previous)}
+    previous_enabled = dict(previous)
+    runs = []
+    for uid, _ in state:
+        position = previous_positions.get(uid)
+        if position is None:
+            runs.append(uid)
+        elif runs and isinstance(runs[-1], list) and sum(runs[-1]) == position:
+            runs[-1][1] += 1
+        else:
+            runs.append([position, 1])
+    flips = [position for position, (uid, enabled) in enumerate(state) if enabled != previous_enabled.get(uid, False)]
+    return runs, flips
+
+
+def decode_delta(previous, runs, flips):
+    state = []
+    for run in runs:
+        if isinstance(run, str):
+            state.append((run, False))
+        else:
+            start, length = run
+            state.extend(previous[start:start + length])
+    for position in flips:
+        uid, enabled = state[position]
+        state[position] = (uid, not enabled)
+    return state
+
+
+class ModConfigHistory:
+    """History of one mod_config.xml, appended to on every write."""
+
+    _histories = {}
+    _histories_lock = threading.Lock()
+
+    @classmethod
+    def for_config(cls, config_path):
+        """Returns the shared history of a mod_config.xml, stored under HISTORY_DIR by a hash of its path."""
+        key = os.path.normcase(os.path.abspath(config_path))
+        with cls._histories_lock:
+            history = cls._histories.get(key)
+            if history is None:
+                name = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+                history = cls._histories[key] = cls(os.path.join(HISTORY_DIR, f"{name}.jsonl"), key)
+            return history
+
+    def __init__(self, history_path, config_path="", keyframe_interval=KEYFRAME_INTERVAL):
+        self.history_path = history_path
+        self.config_path = config_path
+        self.keyframe_interval = keyframe_interval
+        self._lock = threading.RLock()
+        # Byte offset of every record, the snapshot id is the index
+        self._offsets = []
+        self._keyframes = []
+        self._summaries = []
+        self._last_state = None
+        self._load_index()
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def _load_index(self):
+        """Reads the offsets, keyframes and summaries of all records, cutting off a line torn by a crash."""
+        if not os.path.exists(self.history_path):
+            return
+        offset = 0
+        with open(self.history_path, "r+b") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    file.truncate(offset)
+                    break
+                self._add_to_index(offset, record)
+                offset += len(line)
+
+    def _add_to_index(self, offset, record):
+        snapshot_id = len(self._offsets)
+        self._offsets.append(offset)
+        if "key" in record:
+            self._keyframes.append(snapshot_id)
+        self._summaries.append(Snapshot(snapshot_id, record["time"], record["label"], record["mods"], record["enabled"]))
+
+    def snapshots(self):
+        """Returns summaries of all snapshots, oldest first."""
+        return list(self._summaries)
+
+    def latest(self):
+        return self._summaries[-1] if self._summaries else None
+
+    @traced("restore history snapshot")
+    def state(self, snapshot_id):
+        """Returns the (uid, enabled) list of a snapshot, decoded from the keyframe before it.
+
+        Raises IndexError for unknown snapshots, OSError if the history can't be read and ValueError if it was
+        damaged since it was indexed.
+        """
+        with self._lock:
+            if not 0 <= snapshot_id < len(self._offsets):
+                raise IndexError(f"No snapshot #{snapshot_id}")
+            keyframe = self._keyframes[bisect.bisect_right(self._keyframes, snapshot_id) - 1]
+            state = None
+            with open(self.history_path, "rb") as file:
+                file.seek(self._offsets[keyframe])
+                try:
+                    for _ in range(snapshot_id - keyframe + 1):
+                        record = json.loads(file.readline())
+                        if "key" in record:
+                            enabled = set(record["key"]["enabled"])
+                            state = [(uid, position in enabled) for position, uid in enumerate(record["key"]["uids"])]
+                        else:
+                            state = decode_delta(state, record["runs"], record["flips"])
+                except (json.JSONDecodeError, KeyError, TypeError, IndexError) as error:
+                    raise ValueError(f"Snapshot #{snapshot_id} is damaged in {self.history_path}") from error
+            return state
+
+    def record(self, state, label):
+        """Appends a snapshot of state, a list of (uid, enabled), unless it equals the latest one.
+
+        Returns the id of the new snapshot, or None if nothing was recorded.
+        """
+        state = list(state)
+        with self._lock:
+            if self._offsets and self._last_state is None:
+                self._last_state = self.state(len(self._offsets) - 1)
+            if state == self._last_state:
+                return None
+
+            snapshot_id = len(self._offsets)
+            record = {"time": time.time(), "label": label, "mods": len(state), "enabled": sum(enabled for _, enabled in state)}
+            if self._last_state is None or snapshot_id - self._keyframes[-1] >= self.keyframe_interval:
+                record["key"] = {"uids": [uid for uid, _ in state], "enabled": [position for position, (_, enabled) in enumerate(state) if enabled]}
+            else:
+                record["runs"], record["flips"] = encode_delta(self._last_state, state)
+
+            os.makedirs(os.path.dirname(self.history_path) or ".", exist_ok=True)
+            line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+            with open(self.history_path, "ab") as file:
+                offset = file.tell()
+                file.write(line)
+            self._add_to_index(offset, record)
+            self._last_state = state
+            return snapshot_id
@@ -0,0 +1,74 @@
+import os
+
+NOITA_APP_ID = "881100"
+
+
+class ModDirectoryIndex():
+    """Index of installed mod folders, built from a single directory listing per mod location."""
+
+    def __init__(self):
+        self.workshop = {}
+        self.local = {}
+
+    @staticmethod
+    def workshop_content_path(steam_root):
+        """Returns the folder Steam downloads Noita workshop items to."""
+        return os.path.join(steam_root, "steamapps", "workshop", "content", NOITA_APP_ID)
+
+    @staticmethod
+    def local_mods_path(noita_root):
+        """Returns the folder Noita loads local mods from."""
+        return os.path.join(noita_root, "mods")
+
+    @staticmethod
+    def _scan(path):
+        """Returns a dict of subfolder name to path, empty if the folder can't be listed."""
+        folders = {}
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        folders[entry.name] = entry.path
+        except OSError:
+            pass
+        return folders
+
+    def build(self, steam_root, noita_root):
+        """Lists workshop and local mod folders, replacing the previous index."""
+        self.workshop = {}
+        for name, path in self._scan(self.workshop_content_path(steam_root)).items():
+            if name.isdigit():
+                self.workshop[int(name)] = path
+        self.local = self._scan(self.local_mods_path(noita_root))
+
+    def locate(self, mod):
+        """Returns the installed folder of a mod, or None if it isn't installed."""
+        if mod.workshop_item_id > 0:
+            return self.workshop.get(mod.workshop_item_id)
+        return self.local.get(mod.id)
+
+    def untracked(self, mods):
+        """Returns (id, workshop_item_id, folder) for installed mods that are missing from mods."""
+        known_workshop = {mod.workshop_item_id for mod in mods if mod.workshop_item_id > 0}
+        known_local = {mod.id for mod in mods if mod.workshop_item_id <= 0}
+        result = []
+
+        for mod_id, folder in self.local.items():
+            if mod_id not in known_local and os.path.exists(os.path.join(folder, "mod.xml")):
+                result.append((mod_id, 0, folder))
+
+        for workshop_item_id, folder in self.workshop.items():
+            if workshop_item_id not in known_workshop:
+                result.append((self._workshop_mod_id(folder, workshop_item_id), workshop_item_id, folder))
+
+        return result
+
+    @staticmethod
+    def _workshop_mod_id(folder, workshop_item_id):
+        """Reads a workshop item's mod id from mod_id.txt, falling back to the workshop id."""
+        try:
+            with open(os.path.join(folder, "mod_id.txt"), "r") as file:
+                mod_id = file.read().strip()
+        except OSError:
+            mod_id = ""
+        return mod_id or str(workshop_item_id)
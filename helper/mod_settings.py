@@ -0,0 +1,299 @@
+"""Reader and writer for the mod settings Noita keeps in saveXX/mod_settings.bin.
+
+The file is an 8 byte header of two little endian u32, the compressed and the uncompressed size, followed by the
+FastLZ compressed settings. When both sizes are equal the settings are stored uncompressed. The settings start
+with a big endian u64 count, then for every setting:
+
+    u32 key length, key ("<mod id>.<setting id>"), current value, next value
+
+where a value is a u32 type followed by nothing (none), one byte (bool), a f64 (number) or a u32 length and
+UTF-8 text (string), all big endian. The next value is what takes effect once the game restarts.
+"""
+import mmap
+import os
+import struct
+import threading
+import traceback
+from helper.fileio import atomic_write
+from helper.trace import traced
+
+HEADER = struct.Struct("<II")
+COUNT = struct.Struct(">Q")
+U32 = struct.Struct(">I")
+F64 = struct.Struct(">d")
+
+TYPE_NONE, TYPE_BOOL, TYPE_NUMBER, TYPE_STRING = range(4)
+# FastLZ literal runs are at most this long
+MAX_LITERAL = 32
+
+
+def fastlz_decompress(data, size):
+    """Decompresses a FastLZ level 1 or level 2 block into a bytearray of the given size.
+
+    Raises ValueError if the block is corrupt or cut short.
+    """
+    output = bytearray()
+    if not data:
+        return output
+    level = (data[0] >> 5) + 1
+    position, end = 1, len(data)
+    control = data[0] & 31
+    try:
+        while True:
+            if control >= 32:
+                length = (control >> 5) - 1
+                distance = (control & 31) << 8
+                if length == 6:
+                    if level == 1:
+                        length += data[position]
+                        position += 1
+                    else:
+                        while True:
+                            code = data[position]
+                            position += 1
+                            length += code
+                            if code != 255:
+                                break
+                code = data[position]
+                position += 1
+                distance += code
+                if level == 2 and code == 255 and distance == (31 << 8) + 255:
+                    distance = 8191 + (data[position] << 8) + data[position + 1]
+                    position += 2
+                length += 3
+                start = len(output) - distance - 1
+                if start < 0:
+                    raise ValueError("Corrupt FastLZ data, back reference before start")
+                if distance + 1 >= length:
+                    output += output[start:start + length]
+                else:
+                    # Overlapping copy repeats the last distance + 1 bytes
+                    for index in range(start, start + length):
+                        output.append(output[index])
+            else:
+                control += 1
+                if position + control > end:
+                    raise ValueError("Corrupt FastLZ data, literal run past the end")
+                output += data[position:position + control]
+                position += control
+            if position >= end:
+                break
+            control = data[position]
+            position += 1
+    except IndexError:
+        raise ValueError("Corrupt FastLZ data, block ends in the middle of a match") from None
+    if len(output) != size:
+        raise ValueError(f"Corrupt FastLZ data, expected {size} bytes but got {len(output)}")
+    return output
+
+
+def fastlz_store(data):
+    """Encodes data as a FastLZ level 1 block of literal runs only, which every FastLZ decoder reads."""
+    output = bytearray()
+    for start in range(0, len(data), MAX_LITERAL):
+        chunk = data[start:start + MAX_LITERAL]
+        output.append(len(chunk) - 1)
+        output += chunk
+    return bytes(output)
+
+
+def pack_settings(entries):
+    """Returns the contents of a mod_settings.bin holding the given raw entries."""
+    payload = COUNT.pack(len(entries)) + b"".join(entries)
+    compressed = fastlz_store(payload)
+    return HEADER.pack(len(compressed), len(payload)) + compressed
+
+
+class ModSettingsFile:
+    """Settings of a mod_settings.bin, decoded per mod on first access.
+
+    Opening the file maps it just long enough to walk the entries and find where each mod's settings start and
+    end, the map is closed again before returning so the game can still replace the file. Values are decoded when
+    the settings of a mod are asked for. Snapshots and restores copy the raw entries
+    as they are, without decoding anything.
+    """
+
+    _files = {}
+    _files_lock = threading.Lock()
+
+    @classmethod
+    def for_path(cls, path):
+        """Returns a shared reader of the file, opened again if the file changed since it was last opened."""
+        key = os.path.normcase(os.path.abspath(path))
+        try:
+            stat = os.stat(path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            signature = None
+        with cls._files_lock:
+            settings_file = cls._files.get(key)
+            if settings_file is None or settings_file.closed or settings_file.signature != signature:
+                if settings_file is not None:
+                    settings_file.close()
+                settings_file = cls._files[key] = cls(path)
+                settings_file.signature = signature
+            return settings_file
+
+    def __init__(self, path, content=None):
+        """Maps the file at path, or reads the given file contents instead."""
+        self.path = path
+        self.signature = None
+        self.closed = False
+        # Why the file couldn't be parsed, None if it could or doesn't exist
+        self.error = None
+        self._lock = threading.RLock()
+        self._buffer = b""
+        # mod id -> [(start, end) of every entry]
+        self._spans = {}
+        self._decoded = {}
+        if content is not None:
+            self._load(memoryview(content))
+        else:
+            self._open()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @traced("read mod_settings.bin")
+    def _open(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < HEADER.size:
+            return
+        try:
+            with open(self.path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                try:
+                    self._load(memoryview(mapped))
+                except (struct.error, ValueError) as error:
+                    # Frames of the traceback still hold views into the map, which would keep it from closing
+                    traceback.clear_frames(error.__traceback__)
+                    self.close()
+                    raise
+                if isinstance(self._buffer, memoryview) and self._buffer.obj is mapped:
+                    # Uncompressed entries are copied out, nothing may point into the map once it's closed
+                    view, self._buffer = self._buffer, bytes(self._buffer)
+                    view.release()
+        except OSError as error:
+            print(f"Couldn\'t read {self.path}: {error.strerror}.")
+            self.error = error
+        except (struct.error, ValueError) as error:
+            print(f"Couldn\'t parse {self.path}: {error}.")
+            self.error = error
+
+    def _load(self, content):
+        compressed_size, size = HEADER.unpack_from(content)
+        body = content[HEADER.size:HEADER.size + compressed_size]
+        # Uncompressed entries are read straight from the mapped file
+        self._buffer = body if compressed_size == size else memoryview(fastlz_decompress(body, size))
+        self._index()
+
+    def _index(self):
+        """Finds the entries of every mod, reading lengths and key prefixes only."""
+        buffer = self._buffer
+        count, = COUNT.unpack_from(buffer)
+        position = COUNT.size
+        for _ in range(count):
+            start = position
+            key_length, = U32.unpack_from(buffer, position)
+            position += U32.size
+            key = bytes(buffer[position:position + key_length])
+            position = self._skip_value(buffer, self._skip_value(buffer, position + key_length))
+            mod_id = key.partition(b".")[0].decode("utf-8", "replace")
+            self._spans.setdefault(mod_id, []).append((start, position))
+
+    @staticmethod
+    def _skip_value(buffer, position):
+        value_type, = U32.unpack_from(buffer, position)
+        position += U32.size
+        if value_type == TYPE_BOOL:
+            return position + 1
+        if value_type == TYPE_NUMBER:
+            return position + F64.size
+        if value_type == TYPE_STRING:
+            length, = U32.unpack_from(buffer, position)
+            return position + U32.size + length
+        if value_type != TYPE_NONE:
+            raise ValueError(f"Unknown setting type {value_type} at byte {position}")
+        return position
+
+    @staticmethod
+    def _read_value(buffer, position):
+        value_type, = U32.unpack_from(buffer, position)
+        position += U32.size
+        if value_type == TYPE_BOOL:
+            return buffer[position] != 0, position + 1
+        if value_type == TYPE_NUMBER:
+            return F64.unpack_from(buffer, position)[0], position + F64.size
+        if value_type == TYPE_STRING:
+            length, = U32.unpack_from(buffer, position)
+            position += U32.size
+            return bytes(buffer[position:position + length]).decode("utf-8", "replace"), position + length
+        return None, position
+
+    def close(self):
+        with self._lock:
+            # Views into a map have to be released before it can be closed
+            if isinstance(self._buffer, memoryview):
+                self._buffer.release()
+            self._buffer = b""
+            self._spans = {}
+            self._decoded = {}
+            self.closed = True
+
+    def mod_ids(self):
+        """Returns the ids of mods that have settings stored."""
+        return list(self._spans)
+
+    def __contains__(self, mod_id):
+        return mod_id in self._spans
+
+    def settings(self, mod_id):
+        """Returns {setting id: (current value, next value)} of a mod, empty if it has no settings stored."""
+        decoded = self._decoded.get(mod_id)
+        if decoded is None:
+            decoded = {}
+            with self._lock:
+                for start, _ in self._spans.get(mod_id, ()):
+                    key_length, = U32.unpack_from(self._buffer, start)
+                    position = start + U32.size
+                    key = bytes(self._buffer[position:position + key_length]).decode("utf-8", "replace")
+                    current, position = self._read_value(self._buffer, position + key_length)
+                    upcoming, _ = self._read_value(self._buffer, position)
+                    decoded[key.partition(".")[2]] = (current, upcoming)
+            self._decoded[mod_id] = decoded
+        return decoded
+
+    def raw_entries(self, mod_ids=None):
+        """Returns the undecoded entries of the given mods, or of all mods, in file order."""
+        with self._lock:
+            wanted = self._spans if mod_ids is None else {mod_id: self._spans[mod_id] for mod_id in mod_ids if mod_id in self._spans}
+            spans = sorted(span for spans in wanted.values() for span in spans)
+            return [bytes(self._buffer[start:end]) for start, end in spans]
+
+    def snapshot(self, mod_ids):
+        """Returns the settings of the given mods as the contents of a mod_settings.bin."""
+        return pack_settings(self.raw_entries(mod_ids))
+
+    @traced("restore mod settings")
+    def restore(self, snapshot):
+        """Replaces the settings of every mod in a snapshot with the ones in it and writes the file.
+
+        Settings of mods not in the snapshot are kept, as they are in the file now rather than when it was mapped.
+        Raises ValueError instead of writing if the file can't be parsed, since its other settings would be lost.
+        Returns the number of mods whose settings were replaced.
+        """
+        if not self.path:
+            raise ValueError("Settings read from bytes have no file to restore into")
+        with ModSettingsFile(self.path) as current, ModSettingsFile("", snapshot) as restored, self._lock:
+            if current.error is not None:
+                raise ValueError(f"Couldn't parse {self.path}, not overwriting it: {current.error}")
+            replaced = set(restored.mod_ids())
+            kept = current.raw_entries(mod_id for mod_id in current.mod_ids() if mod_id not in replaced)
+            content = pack_settings(kept + restored.raw_entries())
+        # The index points into the old contents
+        self.close()
+        atomic_write(self.path, content)
+        with ModSettingsFile._files_lock:
+            ModSettingsFile._files.pop(os.path.normcase(os.path.abspath(self.path)), None)
+        return len(replaced)
@@ -1,18 +1,89 @@
+import io
 import os
+import json
+import re
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 import helper.shared
+from helper.index import ModDirectoryIndex
+from helper.vdf import read_workshop_manifest
+from helper.fileio import atomic_write
+from helper.trace import span, traced
+from helper.history import ModConfigHistory
+from helper.mod_settings import ModSettingsFile
+
+MOD_ELEMENT = re.compile(rb'<Mod\b[^>]*?(?:/>|>.*?</Mod>)', re.S)
+
+# Attributes of NoitaModXmlData that come from mod_config.xml, and those found by resolving the mod's folder
+CONFIG_ATTRIBUTES = ("order", "enabled", "_settings_fold_open")
+FOLDER_ATTRIBUTES = ("folder", "name", "exists", "installed", "size", "time_updated")
+# Mod list as last read or written, shown on the next start while the mods are read again in the background
+SNAPSHOT_PATH = "mod_list_cache.json"
+
+
+def _lazy(group, attribute):
+    """Property resolving its group of attributes through the owning NoitaModXml on first access."""
+    private = f"_{attribute}"
+    resolved = f"_{group}"
+
+    def getter(self):
+        if not getattr(self, resolved):
+            self.resolve(group)
+        return getattr(self, private)
+
+    def setter(self, value):
+        if not getattr(self, resolved):
+            self.resolve(group)
+        setattr(self, private, value)
+
+    return property(getter, setter)
 
 
 class NoitaModXmlData:
-    def __init__(self, index, mod_attrib):
+    # Slots keep thousands of mods small, folder and name attributes are only resolved when first read
+    __slots__ = ("order", "enabled", "id", "_settings_fold_open", "workshop_item_id", "_uid", "_owner",
+                 "_located", "_folder", "_installed", "_size", "_time_updated", "_named", "_name", "_exists")
+
+    folder = _lazy("located", "folder")
+    installed = _lazy("located", "installed")
+    size = _lazy("located", "size")
+    time_updated = _lazy("located", "time_updated")
+    name = _lazy("named", "name")
+    exists = _lazy("named", "exists")
+
+    def __init__(self, index, mod_attrib, owner=None):
         self.order = index
         self.enabled = self.noita_to_bool(mod_attrib.get("enabled", "0"))
         self.id = mod_attrib.get("name", "")
         self._settings_fold_open = mod_attrib.get("settings_fold_open", "0")
         self.workshop_item_id = int(mod_attrib.get("workshop_item_id", 0))
-        self.folder = ""
-        self.name = ""
         self._uid = f'{self.id}_workshop_{self.workshop_item_id}' if self.workshop_item_id > 0 else self.id
+        self._owner = owner
+        self._located = self._named = False
+        self._folder = self._name = ""
+        self._installed = self._exists = False
+        self._size = self._time_updated = 0
+
+    def resolve(self, group):
+        """Resolves a group of lazy attributes, mods without an owning NoitaModXml keep their defaults."""
+        if self._owner is None:
+            setattr(self, f"_{group}", True)
+        elif group == "located":
+            self._owner._locate(self)
+        else:
+            warning = self._owner._resolve_name(self)
+            if warning:
+                self._owner.warnings.append(warning)
+
+    def update_from(self, other, attributes) -> bool:
+        """Copies the given attributes from another instance of the same mod, returns True if any changed."""
+        changed = False
+        for attribute in attributes:
+            value = getattr(other, attribute)
+            if getattr(self, attribute) != value:
+                setattr(self, attribute, value)
+                changed = True
+        return changed
 
     @staticmethod
     def bool_to_noita(value: bool) -> str:
@@ -26,87 +97,418 @@ class NoitaModXmlData:
 
 
 class NoitaModXml(list):
-    def __init__(self):
-        """Initialize with mod paths and load XML data."""
+    def __init__(self, workers=1, paths=None, save_slot="save00", history=True):
+        """Initialize with mod paths and load XML data.
+
+        Without explicit paths the ones configured in helper.shared.data are used.
+        """
         super().__init__()
+        self.workers = workers
+        self._paths = paths
+        self.save_slot = save_slot
+        self.record_history = history
+        self.warnings = []
+        self.index = ModDirectoryIndex()
+        self.workshop_items = {}
+        self._loaded_raw = b""
+        self._loaded_spans = None
+        self._loaded_uids = []
+        self._loaded_state = None
+        # State of the mods of the last snapshot shown, until the file was read once
+        self._snapshot_state = None
+
+    def read_xml(self, workers=None, resolve=False):
+        """Load mod data from the XML file specified in save path.
 
-    def read_xml(self):
-        """Load mod data from the XML file specified in save path."""
+        Mod folders and names are resolved when first accessed, or right away with resolve=True,
+        on a thread pool when more than one worker is requested.
+        """
         self.clear()
-        save_path = os.path.join(helper.shared.data.paths.get("noita_save", ""), "save00", "mod_config.xml")
+        for chunk, _ in self.iter_read(workers, resolve=resolve):
+            self.extend(chunk)
+
+    @property
+    def paths(self):
+        return self._paths if self._paths is not None else helper.shared.data.paths
+
+    def mod_config_path(self):
+        return os.path.join(self.paths.get("noita_save", ""), self.save_slot, "mod_config.xml")
+
+    def mod_settings_path(self):
+        return os.path.join(self.paths.get("noita_save", ""), self.save_slot, "mod_settings.bin")
+
+    @property
+    def mod_settings(self):
+        """Mod settings of the save slot, read again when the file changed."""
+        return ModSettingsFile.for_path(self.mod_settings_path())
+
+    @property
+    def history(self):
+        """Snapshot history of the mod_config.xml at the current paths."""
+        return ModConfigHistory.for_config(self.mod_config_path())
+
+    def restore_state(self, state):
+        """Reorders and enables mods to match a history snapshot, a list of (uid, enabled).
+
+        Mods the snapshot doesn't know are kept disabled after the others, mods no longer in the list are added back.
+        """
+        remaining = {}
+        for mod in self:
+            remaining.setdefault(mod._uid, []).append(mod)
+        restored = []
+        for uid, enabled in state:
+            matches = remaining.get(uid)
+            mod = matches.pop(0) if matches else self._mod_from_uid(uid)
+            mod.enabled = enabled
+            restored.append(mod)
+        for mods in remaining.values():
+            for mod in mods:
+                mod.enabled = False
+                restored.append(mod)
+        for index, mod in enumerate(restored):
+            mod.order = index
+        self[:] = restored
+
+    def _mod_from_uid(self, uid):
+        mod_id, separator, workshop_item_id = uid.rpartition("_workshop_")
+        if not separator or not workshop_item_id.isdigit():
+            mod_id, workshop_item_id = uid, "0"
+        return NoitaModXmlData(len(self), {"name": mod_id, "workshop_item_id": workshop_item_id}, self)
+
+    def read_changes(self, workers=None):
+        """Read mod data from disk into new objects without modifying the list.
+
+        Returns the mods and whether mod_config.xml differs from what was last read or written.
+        """
+        previous = self._loaded_raw
+        mods = [mod for chunk, _ in self.iter_read(workers) for mod in chunk]
+        snapshot_state, self._snapshot_state = self._snapshot_state, None
+        if not previous and snapshot_state is not None:
+            # Nothing was read yet but a snapshot was shown, which is what edits so far were made on
+            return mods, [self._mod_state(mod) for mod in mods] != snapshot_state
+        return mods, self._loaded_raw != previous
+
+    def save_snapshot(self, mods=None):
+        """Stores the mod list with resolved folders and names, so the next start can show it before reading anything."""
+        mods = list(mods if mods is not None else self)
+        records = [[mod.id, mod.workshop_item_id, mod.enabled, mod._settings_fold_open] +
+                   [getattr(mod, attribute) for attribute in FOLDER_ATTRIBUTES] for mod in mods]
+        try:
+            atomic_write(SNAPSHOT_PATH, json.dumps({"config": self.mod_config_path(), "mods": records}).encode("utf-8"))
+        except OSError as error:
+            print(f"Couldn\'t write {SNAPSHOT_PATH}: {error.strerror}.")
+
+    @traced("read mod list snapshot")
+    def read_snapshot(self):
+        """Returns the mods of the last snapshot of this mod_config.xml as fully resolved objects, or None.
+
+        The snapshot may be outdated, read_changes() tells what changed on disk since.
+        """
+        try:
+            with open(SNAPSHOT_PATH, "r") as file:
+                snapshot = json.load(file)
+            if snapshot["config"] != self.mod_config_path():
+                return None
+            mods = []
+            for index, (mod_id, workshop_item_id, enabled, settings_fold_open, *folder_values) in enumerate(snapshot["mods"]):
+                mod = NoitaModXmlData(index, {"name": mod_id, "workshop_item_id": workshop_item_id,
+                                              "enabled": NoitaModXmlData.bool_to_noita(enabled), "settings_fold_open": settings_fold_open}, self)
+                for attribute, value in zip(FOLDER_ATTRIBUTES, folder_values):
+                    setattr(mod, f"_{attribute}", value)
+                mod._located = mod._named = True
+                mods.append(mod)
+            self._snapshot_state = [self._mod_state(mod) for mod in mods]
+            return mods
+        except (OSError, json.JSONDecodeError, KeyError, TypeError, ValueError):
+            return None
+
+    def _parse_mods(self, raw):
+        """Parse <Mod> entries with a streaming parser, clearing elements as soon as they are read."""
+        mods = []
+        events = ET.iterparse(io.BytesIO(raw), events=("start", "end"))
+        _, root = next(events)
+        for event, element in events:
+            if event == "end" and element.tag == "Mod":
+                mods.append(NoitaModXmlData(len(mods), element.attrib, self))
+                root.clear()
+        return mods
+
+    def iter_read(self, workers=None, chunk_size=100, resolve=True):
+        """Yield (mods, total mod count) chunks in mod_config.xml order without modifying the list.
+
+        With resolve, folders and names of each chunk are resolved before it is yielded.
+        Stopping the iteration early cancels resolving the remaining mods.
+        Without resolve, call flush() once the mods that were needed have been resolved.
+        """
+        self.warnings = []
+        helper.shared.cache.reset_stats()
+        save_path = self.mod_config_path()
 
         if not save_path or not os.path.exists(save_path):
             print(f"Warning: Save path '{save_path}' does not exist.")
             return
 
         # Parse XML and instantiate mod data objects
-        tree = ET.parse(save_path)
-        root = tree.getroot()
-
-        for index, mod in enumerate(root.findall('./Mod')):
-            mod_data = NoitaModXmlData(index, mod.attrib)
-            self.append(mod_data)
-            self._set_mod_paths(mod_data)
-
-    def _set_mod_paths(self, mod):
-        """Set the folder path and name for each mod based on local or workshop ID."""
-        if mod.workshop_item_id > 0:
-            mod.folder = os.path.join(
-                helper.shared.data.paths.get("steam_root", ""),
-                "steamapps",
-                "workshop",
-                "content",
-                "881100",
-                str(mod.workshop_item_id)
-            )
+        with span("parse mod_config.xml"):
+            with open(save_path, "rb") as file:
+                raw = file.read()
+            mods = self._parse_mods(raw)
+            self._remember_loaded(raw, [self._mod_state(mod) for mod in mods])
+        with span("build mod directory index"):
+            self.index.build(self.paths.get("steam_root", ""), self.paths.get("noita_root", ""))
+        with span("read workshop manifest"):
+            self.workshop_items = read_workshop_manifest(self.paths.get("steam_root", ""))
+
+        if not resolve:
+            for start in range(0, len(mods), chunk_size):
+                yield mods[start:start + chunk_size], len(mods)
+            return
+
+        workers = workers if workers is not None else self.workers
+        executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 and len(mods) > 1 else None
+        # executor.map submits every mod up front and yields results in order, so workers stay busy between chunks
+        warnings = executor.map(self._resolve_name, mods) if executor else map(self._resolve_name, mods)
+        try:
+            chunk = []
+            for mod, warning in zip(mods, warnings):
+                chunk.append(mod)
+                if warning:
+                    self.warnings.append(warning)
+                if len(chunk) >= chunk_size:
+                    yield chunk, len(mods)
+                    chunk = []
+            if chunk:
+                yield chunk, len(mods)
+        finally:
+            if executor:
+                executor.shutdown(wait=True, cancel_futures=True)
+            self.flush()
+
+        print(f"Mod metadata cache: {helper.shared.cache.hits} hits, {helper.shared.cache.misses} misses.")
+
+    def flush(self):
+        """Writes metadata resolved so far to the cache and reports the warnings collected while resolving it.
+
+        Reads with resolve do this themselves, after a lazy read it's up to the caller once it's done with the mods.
+        """
+        with span("write metadata cache"):
+            helper.shared.cache.write_to_file()
+        self.report_warnings()
+        self.warnings = []
+
+    def report_warnings(self):
+        """Print all warnings collected since the last report as a single report."""
+        if not self.warnings:
+            return
+        print(f"Warning: {len(self.warnings)} problem(s) while reading mod data:")
+        for warning in self.warnings:
+            print(f"  - {warning}")
+
+    @traced("locate mod")
+    def _locate(self, mod):
+        """Set folder and installation state of a mod from Steam's manifest or the directory index."""
+        workshop_item = self.workshop_items.get(mod.workshop_item_id) if mod.workshop_item_id > 0 else None
+        if workshop_item is not None:
+            mod._installed = workshop_item.installed
+            mod._size = workshop_item.size
+            mod._time_updated = workshop_item.time_updated
+            mod._folder = os.path.join(ModDirectoryIndex.workshop_content_path(self.paths.get("steam_root", "")), str(mod.workshop_item_id))
         else:
-            mod.folder = os.path.join(helper.shared.data.paths.get("noita_root", ""), "mods", mod.id)
+            folder = self.index.locate(mod)
+            mod._installed = folder is not None
+            if folder is not None:
+                mod._folder = folder
+            elif mod.workshop_item_id > 0:
+                # Not installed, keep the expected location so the folder can still be shown
+                mod._folder = os.path.join(ModDirectoryIndex.workshop_content_path(self.paths.get("steam_root", "")), str(mod.workshop_item_id))
+            else:
+                mod._folder = os.path.join(ModDirectoryIndex.local_mods_path(self.paths.get("noita_root", "")), mod.id)
+        mod._located = True
+
+    @traced("resolve mod name")
+    def _resolve_name(self, mod):
+        """Set the name of a mod and whether its 'mod.xml' exists.
+
+        Returns a warning message instead of printing it, so it can be run from worker threads.
+        """
+        try:
+            if not mod.installed:
+                mod._name, mod._exists = "", False
+                return None
+
+            mod_xml_file = os.path.join(mod.folder, "mod.xml")
+            workshop_item = self.workshop_items.get(mod.workshop_item_id) if mod.workshop_item_id > 0 else None
+            if workshop_item is not None:
+                # Steam bumps timeupdated and size whenever the item changes, so they validate the cache without a stat
+                signature = ["acf", workshop_item.time_updated, workshop_item.size]
+            else:
+                # A single stat tells whether the mod.xml exists and whether the cached metadata is still valid
+                signature = helper.shared.cache.stat_signature(mod_xml_file)
+                if signature is None:
+                    mod._name, mod._exists = "", False
+                    return None
+
+            return self._read_mod_metadata(mod, mod_xml_file, signature)
+        finally:
+            mod._named = True
+
+    def _read_mod_metadata(self, mod, mod_xml_file, signature):
+        """Set mod name and existence from the metadata cache, parsing 'mod.xml' only on a cache miss."""
+        metadata = helper.shared.cache.lookup(mod_xml_file, signature)
+        if metadata is not None:
+            mod._name = metadata["name"]
+            mod._exists = metadata["exists"]
+            return None
 
         # Attempt to read the mod's display name from its 'mod.xml' file
-        mod_xml_file = os.path.join(mod.folder, "mod.xml")
-        if os.path.exists(mod_xml_file):
-            try:
-                tree = ET.parse(mod_xml_file)
-                root = tree.getroot()
-                mod.name = root.attrib.get("name", mod.id)  # Use ID if name is missing
-            except ET.ParseError:
-                print(f"Warning: Could not parse mod XML file at '{mod_xml_file}'.")
+        mod._name = ""
+        try:
+            tree = ET.parse(mod_xml_file)
+            root = tree.getroot()
+            mod._exists = True
+            mod._name = root.attrib.get("name", mod.id)  # Use ID if name is missing
+            helper.shared.cache.store(mod_xml_file, signature, {"name": mod._name, "folder": mod.folder, "exists": mod._exists})
+        except ET.ParseError:
+            mod._exists = True
+            return f"Could not parse mod XML file at '{mod_xml_file}'."
+        except FileNotFoundError:
+            mod._exists = False
+        except OSError as error:
+            return f"Could not read mod XML file at '{mod_xml_file}': {error.strerror}."
+        return None
+
+    def untracked_mods(self):
+        """Returns mod data for installed mods that are missing from mod_config.xml, disabled by default."""
+        untracked = []
+        for mod_id, workshop_item_id, _ in self.index.untracked(self):
+            mod = NoitaModXmlData(len(self) + len(untracked), {"name": mod_id, "workshop_item_id": str(workshop_item_id)}, self)
+            untracked.append(mod)
+        return untracked
 
     @staticmethod
     def create_mod_element(mod):
         """Create an XML element for a mod, including attributes and formatting."""
+        return NoitaModXml._state_element(NoitaModXml._mod_state(mod))
+
+    @staticmethod
+    def _state_element(state):
+        """Create an XML element from the state of a mod as returned by _mod_state()."""
+        _, mod_id, workshop_item_id, enabled, settings_fold_open = state
         mod_element = ET.Element(
             "Mod",
-            enabled=NoitaModXmlData.bool_to_noita(mod.enabled),
-            name=mod.id,
-            settings_fold_open=mod._settings_fold_open,
-            workshop_item_id=str(mod.workshop_item_id)
+            enabled=NoitaModXmlData.bool_to_noita(enabled),
+            name=mod_id,
+            settings_fold_open=settings_fold_open,
+            workshop_item_id=str(workshop_item_id)
         )
         mod_element.text = "\n\n  "
         return mod_element
 
-    def write_back(self):
-        """Write modified mod data back to the XML file, formatted for readability."""
+    @staticmethod
+    def _mod_state(mod):
+        """Everything about a mod that ends up in mod_config.xml."""
+        return mod._uid, mod.id, mod.workshop_item_id, mod.enabled, mod._settings_fold_open
+
+    def _remember_loaded(self, raw, state):
+        """Keep the file as read or written and the state of its mods, so writes can be skipped or patched in place."""
+        spans = [match.span() for match in MOD_ELEMENT.finditer(raw)]
+        self._loaded_raw = raw
+        self._loaded_spans = spans if spans and len(spans) == len(state) else None
+        self._loaded_uids = [uid for uid, *_ in state]
+        self._loaded_state = list(state)
+
+    @staticmethod
+    def _set_attribute(element, name, value):
+        """Set an attribute in the start tag of a serialized element, leaving the rest of its bytes untouched."""
+        tag_end = element.index(b">")
+        tag, count = re.subn(rb'(\s' + name + rb'=")[^"]*(")', lambda match: match.group(1) + value + match.group(2), element[:tag_end], count=1)
+        if not count:
+            tag = tag[:4] + b" " + name + b'="' + value + b'"' + tag[4:]
+        return tag + element[tag_end:]
+
+    def _render_patched(self, state):
+        """Rebuild the loaded file with mods in their new order, reusing the original bytes of every known element.
+
+        Returns None if the loaded file couldn't be split into elements.
+        """
+        raw, spans = self._loaded_raw, self._loaded_spans
+        if not spans:
+            return None
+
+        elements = {}
+        for uid, (start, end) in zip(self._loaded_uids, spans):
+            elements.setdefault(uid, []).append(raw[start:end])
+        separators = [raw[spans[i][1]:spans[i + 1][0]] for i in range(len(spans) - 1)]
+        default_separator = separators[-1] if separators else b"\n  "
+
+        pieces = [raw[:spans[0][0]]]
+        for position, mod_state in enumerate(state):
+            uid, _, _, enabled, settings_fold_open = mod_state
+            if position:
+                pieces.append(separators[position - 1] if position - 1 < len(separators) else default_separator)
+            original = elements.get(uid)
+            element = original.pop(0) if original else ET.tostring(self._state_element(mod_state))
+            element = self._set_attribute(element, b"enabled", NoitaModXmlData.bool_to_noita(enabled).encode())
+            element = self._set_attribute(element, b"settings_fold_open", settings_fold_open.encode())
+            pieces.append(element)
+        pieces.append(raw[spans[-1][1]:])
+        return b"".join(pieces)
+
+    def _render(self, state):
+        """Serialize the state of mods as a new mod_config.xml, formatted for readability."""
         root = ET.Element("Mods")
         root.text = "\n\n"
 
-        for mod in self:
-            root.append(self.create_mod_element(mod))
+        for mod_state in state:
+            root.append(self._state_element(mod_state))
+
+        tree = ET.ElementTree(root)
+        ET.indent(tree, space='\n  ', level=0)
+        return ET.tostring(root)
+
+    @traced("write mod_config.xml")
+    def write_back(self, mods=None, label="Saved"):
+        """Write modified mod data back to the XML file, skipped if nothing changed since it was read.
+
+        Untouched parts of the file keep their original bytes, and the file is replaced atomically.
+        A snapshot of the mods can be passed in so a background write doesn't read the list while it changes.
+        Their state is taken once up front and everything is rendered from it, so mods changed while the write
+        runs are written by the next one. The state before and after the write is recorded in the history under label.
+        """
+        mods = list(mods if mods is not None else self)
+        state = [self._mod_state(mod) for mod in mods]
+        if state == self._loaded_state:
+            print("Mod data is unchanged, nothing to write.")
+            return
 
-        # Write formatted XML to file
-        path = os.path.join(helper.shared.data.paths.get("noita_save", ""), "save00", "mod_config.xml")
+        path = self.mod_config_path()
         if not path:
             print("Warning: No path specified for writing XML data.")
             return
 
+        content = self._render_patched(state)
+        if content is None:
+            content = self._render(state)
+
+        previous = self._loaded_state
         try:
-            tree = ET.ElementTree(root)
-            ET.indent(tree, space='\n  ', level=0)
-            # tree.indent(root, space='  ', level=0)
-            with open(path, 'wb') as file:
-                tree.write(file)
+            atomic_write(path, content)
+            self._remember_loaded(content, state)
             print(f"Successfully wrote mod data to '{path}'.")
         except FileNotFoundError:
             print(f"Error: Path '{path}' not found.")
         except PermissionError:
             print(f"Error: Insufficient permissions to write to '{path}'.")
+        else:
+            if self.record_history:
+                self._record_history(previous, state, label)
+
+    def _record_history(self, previous, state, label):
+        try:
+            history = self.history
+            # Changes made outside the manager, such as by Noita, would otherwise be lost from the history
+            if previous is not None:
+                history.record([(uid, enabled) for uid, _, _, enabled, _ in previous], "Before write")
+            history.record([(uid, enabled) for uid, _, _, enabled, _ in state], str(label))
+        except OSError as error:
+            print(f"Warning: Couldn't record history: {error.strerror}.")
@@ -0,0 +1,133 @@
+import sqlite3
+import threading
+import time
+from collections.abc import MutableMapping
+from helper.trace import traced
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS presets (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    created REAL NOT NULL,
+    modified REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS preset_mods (
+    preset_id INTEGER NOT NULL REFERENCES presets(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    uid TEXT NOT NULL,
+    PRIMARY KEY (preset_id, position)
+);
+CREATE INDEX IF NOT EXISTS preset_mods_uid ON preset_mods(uid);
+"""
+
+
+class SqlitePresetStore(MutableMapping):
+    """Presets in an SQLite database, usable in place of the presets dict of ModManagerData.
+
+    Maps preset names to lists of mod UIDs like the dict does. Every change is written right away in its own
+    transaction, so saving one preset never rewrites the others. Member lists are read once and kept in memory,
+    and a stored list is never modified in place, so PresetEngine can cache by identity like with the dict.
+    """
+
+    def __init__(self, database_path="presets.db"):
+        self.database_path = database_path
+        # Batch operations read presets from several threads, the lock serializes access to the connection
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(database_path, check_same_thread=False)
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self._connection.executescript(SCHEMA)
+        # Preset names in creation order, as dict keys for fast membership tests
+        self._names = dict.fromkeys(name for name, in self._connection.execute("SELECT name FROM presets ORDER BY id"))
+        self._members = {}
+
+    def __len__(self):
+        return len(self._names)
+
+    def __iter__(self):
+        return iter(list(self._names))
+
+    def __contains__(self, name):
+        return name in self._names
+
+    def __getitem__(self, name):
+        members = self._members.get(name)
+        if members is None:
+            with self._lock:
+                rows = self._connection.execute(
+                    "SELECT preset_mods.uid FROM presets LEFT JOIN preset_mods ON preset_mods.preset_id = presets.id "
+                    "WHERE presets.name = ? ORDER BY preset_mods.position", (name,)).fetchall()
+                if not rows:
+                    raise KeyError(name)
+                members = self._members[name] = [uid for uid, in rows if uid is not None]
+        return members
+
+    @traced("store preset")
+    def __setitem__(self, name, uids):
+        uids = list(uids)
+        now = time.time()
+        with self._lock, self._connection:
+            row = self._connection.execute("SELECT id FROM presets WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                preset_id = self._connection.execute("INSERT INTO presets (name, created, modified) VALUES (?, ?, ?)", (name, now, now)).lastrowid
+                self._names[name] = None
+            else:
+                preset_id = row[0]
+                self._connection.execute("UPDATE presets SET modified = ? WHERE id = ?", (now, preset_id))
+                self._connection.execute("DELETE FROM preset_mods WHERE preset_id = ?", (preset_id,))
+            self._connection.executemany("INSERT INTO preset_mods (preset_id, position, uid) VALUES (?, ?, ?)",
+                                         ((preset_id, position, uid) for position, uid in enumerate(uids)))
+            self._members[name] = uids
+
+    def __delitem__(self, name):
+        with self._lock, self._connection:
+            if self._connection.execute("DELETE FROM presets WHERE name = ?", (name,)).rowcount == 0:
+                raise KeyError(name)
+            del self._names[name]
+            self._members.pop(name, None)
+
+    def rename(self, name, new_name):
+        """Renames a preset keeping its members and creation time, raises KeyError if it doesn't exist."""
+        with self._lock, self._connection:
+            if new_name in self:
+                raise ValueError(f"A preset named '{new_name}' already exists")
+            if self._connection.execute("UPDATE presets SET name = ?, modified = ? WHERE name = ?", (new_name, time.time(), name)).rowcount == 0:
+                raise KeyError(name)
+            self._names = {new_name if key == name else key: None for key in self._names}
+            if name in self._members:
+                self._members[new_name] = self._members.pop(name)
+
+    def presets_with(self, uid):
+        """Returns the names of presets including the mod, answered from the index on mod UIDs."""
+        with self._lock:
+            return [name for name, in self._connection.execute(
+                "SELECT DISTINCT presets.name FROM preset_mods JOIN presets ON presets.id = preset_mods.preset_id "
+                "WHERE preset_mods.uid = ? ORDER BY presets.id", (uid,))]
+
+    def timestamps(self, name):
+        """Returns (created, modified) of a preset as Unix times, or None if it doesn't exist."""
+        with self._lock:
+            return self._connection.execute("SELECT created, modified FROM presets WHERE name = ?", (name,)).fetchone()
+
+    @traced("migrate presets")
+    def migrate(self, presets):
+        """Imports presets from a dict of name -> UIDs in one transaction, existing presets are kept.
+
+        Returns the names that were imported, presets whose name is already taken are left out.
+        """
+        now = time.time()
+        migrated = []
+        with self._lock, self._connection:
+            for name, uids in presets.items():
+                if name in self:
+                    continue
+                migrated.append(name)
+                preset_id = self._connection.execute("INSERT INTO presets (name, created, modified) VALUES (?, ?, ?)", (name, now, now)).lastrowid
+                self._connection.executemany("INSERT INTO preset_mods (preset_id, position, uid) VALUES (?, ?, ?)",
+                                             ((preset_id, position, uid) for position, uid in enumerate(uids)))
+                self._names[name] = None
+                self._members[name] = list(uids)
+        return migrated
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,182 @@
+import os
+import hashlib
+import threading
+from helper.fileio import atomic_write
+from helper.trace import traced
+
+# Folder of mod settings snapshots saved with presets, one mod_settings.bin per preset
+PRESET_SETTINGS_DIR = "preset_settings"
+
+
+class PresetChanges:
+    def __init__(self, enable, disable, missing):
+        self.enable = enable
+        self.disable = disable
+        self.missing = missing
+
+    def __bool__(self):
+        return bool(self.enable or self.disable)
+
+    def summary(self):
+        """Returns a human readable description of the changes."""
+        lines = [f"Enable {len(self.enable)} mod(s), disable {len(self.disable)} mod(s)."]
+        if self.missing:
+            lines.append(f"{len(self.missing)} mod(s) in this preset are not installed:")
+            lines.extend(f"  {uid}" for uid in self.missing[:10])
+            if len(self.missing) > 10:
+                lines.append(f"  ... and {len(self.missing) - 10} more")
+        return "\n".join(lines)
+
+
+class PresetEngine():
+    """Presets stored in ModManagerData, handled as sets of interned mod UIDs.
+
+    Interning turns every UID into a small int once, so applying a preset is a single pass over the mods
+    and diffs and merges between presets are plain set operations.
+    """
+
+    def __init__(self, data, settings_dir=PRESET_SETTINGS_DIR):
+        self._data = data
+        self._settings_dir = settings_dir
+        self._ids = {}
+        self._uids = []
+        self._sets = {}
+        self._lock = threading.Lock()
+
+    def intern(self, uid):
+        """Returns the int standing for uid, assigning a new one on first use."""
+        interned = self._ids.get(uid)
+        if interned is None:
+            # Batch operations apply presets from several threads
+            with self._lock:
+                interned = self._ids.get(uid)
+                if interned is None:
+                    self._uids.append(uid)
+                    interned = self._ids[uid] = len(self._uids) - 1
+        return interned
+
+    def uids(self, interned_set):
+        """Returns the UIDs of a set of interned ids, sorted for display."""
+        return sorted(self._uids[interned] for interned in interned_set)
+
+    def preset_set(self, name):
+        """Returns the interned set of a preset, rebuilt only if the stored list was replaced."""
+        members = self._data.presets[name]
+        cached = self._sets.get(name)
+        if cached is None or cached[0] is not members:
+            cached = self._sets[name] = (members, frozenset(self.intern(uid) for uid in members))
+        return cached[1]
+
+    def enabled_set(self, mods):
+        return frozenset(self.intern(mod._uid) for mod in mods if mod.enabled)
+
+    def save(self, name, mods):
+        """Stores the enabled mods as a preset."""
+        self.store(name, [mod._uid for mod in mods if mod.enabled])
+
+    def store(self, name, uids):
+        """Stores a list of UIDs as a preset."""
+        self._data.presets[name] = list(uids)
+        self._data.mark_dirty()
+
+    def delete(self, name):
+        del self._data.presets[name]
+        self._sets.pop(name, None)
+        self.delete_settings(name)
+        self._data.mark_dirty()
+
+    def rename(self, name, new_name):
+        """Renames a preset, raises ValueError if new_name is taken."""
+        presets = self._data.presets
+        if new_name in presets:
+            raise ValueError(f"A preset named '{new_name}' already exists")
+        if hasattr(presets, "rename"):
+            presets.rename(name, new_name)
+        else:
+            # Rebuilt so the preset keeps its place in manager.json
+            self._data.presets = {new_name if key == name else key: members for key, members in presets.items()}
+        if name in self._sets:
+            self._sets[new_name] = self._sets.pop(name)
+        if self.has_settings(name):
+            os.replace(self.settings_path(name), self.settings_path(new_name))
+        self._data.mark_dirty()
+
+    def presets_with(self, uid):
+        """Returns the names of presets including the mod with uid."""
+        presets = self._data.presets
+        if hasattr(presets, "presets_with"):
+            return presets.presets_with(uid)
+        interned = self.intern(uid)
+        return [name for name in presets if interned in self.preset_set(name)]
+
+    def timestamps(self, name):
+        """Returns (created, modified) Unix times of a preset, None if the preset store doesn't keep them."""
+        presets = self._data.presets
+        return presets.timestamps(name) if hasattr(presets, "timestamps") else None
+
+    def settings_path(self, name):
+        digest = hashlib.sha1(name.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self._settings_dir, f"{digest}.bin")
+
+    def has_settings(self, name):
+        return os.path.exists(self.settings_path(name))
+
+    def save_settings(self, name, mods, settings_file):
+        """Stores the settings of the enabled mods with a preset, as raw entries copied from settings_file."""
+        os.makedirs(self._settings_dir, exist_ok=True)
+        atomic_write(self.settings_path(name), settings_file.snapshot(mod.id for mod in mods if mod.enabled))
+
+    def delete_settings(self, name):
+        if self.has_settings(name):
+            os.remove(self.settings_path(name))
+
+    def apply_settings(self, name, settings_file):
+        """Writes the settings stored with a preset into settings_file, returns the number of mods restored."""
+        with open(self.settings_path(name), "rb") as file:
+            return settings_file.restore(file.read())
+
+    @traced("preview preset")
+    def preview(self, name, mods):
+        """Returns what loading a preset would change, without changing anything."""
+        preset = self.preset_set(name)
+        enable, disable = [], []
+        installed = set()
+        for mod in mods:
+            interned = self.intern(mod._uid)
+            if interned in preset:
+                if mod.exists:
+                    installed.add(interned)
+                if not mod.enabled:
+                    enable.append(mod)
+            elif mod.enabled:
+                disable.append(mod)
+        return PresetChanges(enable, disable, self.uids(preset - installed))
+
+    @traced("apply preset")
+    def apply(self, name, mods):
+        """Enables exactly the mods in a preset, returns the mods whose state changed."""
+        preset = self.preset_set(name)
+        changed = []
+        for mod in mods:
+            enabled = self.intern(mod._uid) in preset
+            if mod.enabled != enabled:
+                mod.enabled = enabled
+                changed.append(mod)
+        return changed
+
+    def missing(self, name, mods):
+        """Returns UIDs in a preset whose mods are not installed."""
+        installed = frozenset(self.intern(mod._uid) for mod in mods if mod.exists)
+        return self.uids(self.preset_set(name) - installed)
+
+    def diff(self, first, second):
+        """Returns (UIDs only in first, UIDs only in second)."""
+        first_set, second_set = self.preset_set(first), self.preset_set(second)
+        return self.uids(first_set - second_set), self.uids(second_set - first_set)
+
+    def union(self, names):
+        return self.uids(frozenset().union(*(self.preset_set(name) for name in names)))
+
+    def intersection(self, names):
+        sets = [self.preset_set(name) for name in names]
+        return self.uids(frozenset.intersection(*sets)) if sets else []
@@ -0,0 +1,114 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import helper.shared
+from helper.parser import NoitaModXml
+from helper.config import NoitaConfig
+
+
+class Profile:
+    """A Noita install and save slot to run batch operations on."""
+
+    def __init__(self, name, noita_root="", noita_save="", steam_root="", save_slot="save00"):
+        self.name = name
+        self.paths = {"noita_root": noita_root, "noita_save": noita_save, "steam_root": steam_root}
+        self.save_slot = save_slot
+
+    @classmethod
+    def from_dict(cls, name, profile):
+        return cls(name, profile.get("noita_root", ""), profile.get("noita_save", ""), profile.get("steam_root", ""), profile.get("save_slot", "save00"))
+
+    def to_dict(self):
+        return {**self.paths, "save_slot": self.save_slot}
+
+    def load(self):
+        """Reads the profile's mods and config, returns them as (NoitaModXml, NoitaConfig)."""
+        mods = NoitaModXml(paths=self.paths, save_slot=self.save_slot, history=helper.shared.data.settings["history"])
+        if not os.path.exists(mods.mod_config_path()):
+            raise FileNotFoundError(f"No mod_config.xml at '{mods.mod_config_path()}'")
+        mods.read_xml()
+        config = NoitaConfig(paths=self.paths)
+        config.read_xml()
+        return mods, config
+
+
+class ProfileResult:
+    def __init__(self, profile, ok, message):
+        self.profile = profile
+        self.ok = ok
+        self.message = message
+
+    def __str__(self):
+        return f"{self.profile.name}: {'OK' if self.ok else 'FAILED'} - {self.message}"
+
+
+def saved_profiles(names=None):
+    """Returns profiles stored in helper.shared.data, optionally only the given names in that order."""
+    profiles = helper.shared.data.profiles
+    if names is None:
+        names = list(profiles)
+    missing = [name for name in names if name not in profiles]
+    if missing:
+        raise KeyError(f"Unknown profile(s): {', '.join(missing)}")
+    return [Profile.from_dict(name, profiles[name]) for name in names]
+
+
+def save_profile(profile):
+    helper.shared.data.profiles[profile.name] = profile.to_dict()
+    helper.shared.data.mark_dirty()
+
+
+def delete_profile(name):
+    del helper.shared.data.profiles[name]
+    helper.shared.data.mark_dirty()
+
+
+def run_batch(profiles, operation, workers=4):
+    """Runs operation(profile) -> message on every profile concurrently, returns one ProfileResult per profile."""
+    def run(profile):
+        try:
+            return ProfileResult(profile, True, operation(profile))
+        except Exception as error:
+            # One broken install shouldn't stop the others
+            return ProfileResult(profile, False, str(error) or type(error).__name__)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(profiles)))) as executor:
+        return list(executor.map(run, profiles))
+
+
+def _write(mods, config):
+    mods.write_back()
+    config.write_back()
+    # Profiles are read lazily, so store what resolving the mods found
+    mods.flush()
+
+
+def apply_preset(preset_name):
+    """Returns an operation enabling exactly the mods of a preset in a profile."""
+    def operation(profile):
+        mods, config = profile.load()
+        changed = helper.shared.presets.apply(preset_name, mods)
+        missing = helper.shared.presets.missing(preset_name, mods)
+        _write(mods, config)
+        return f"{len(changed)} mod(s) changed, {len(missing)} preset mod(s) not installed"
+    return operation
+
+
+def sync_order(source_mods):
+    """Returns an operation giving a profile the load order and enabled states of source_mods.
+
+    Mods the source doesn't have keep their relative order after the shared ones.
+    """
+    position = {mod._uid: index for index, mod in enumerate(source_mods)}
+    enabled = {mod._uid: mod.enabled for mod in source_mods}
+
+    def operation(profile):
+        mods, config = profile.load()
+        shared = sorted((mod for mod in mods if mod._uid in position), key=lambda mod: position[mod._uid])
+        others = [mod for mod in mods if mod._uid not in position]
+        mods[:] = shared + others
+        for index, mod in enumerate(mods):
+            mod.order = index
+            mod.enabled = enabled.get(mod._uid, mod.enabled)
+        _write(mods, config)
+        return f"{len(shared)} mod(s) synced, {len(others)} not in source"
+    return operation
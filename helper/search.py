@@ -0,0 +1,103 @@
+from helper.trace import traced
+
+# Length of the substrings indexed, queries at least this long are answered from the index
+NGRAM = 3
+
+# Filters that can be combined with a search, a mod has to pass all that are active
+FILTERS = {
+    "enabled": lambda mod: mod.enabled,
+    "workshop": lambda mod: mod.workshop_item_id > 0,
+    "missing": lambda mod: not mod.installed,
+}
+
+
+def search_text(mod):
+    """Returns the lowercase text a mod is found by: its name, id and workshop id."""
+    workshop = str(mod.workshop_item_id) if mod.workshop_item_id > 0 else ""
+    return f"{mod.name}\n{mod.id}\n{workshop}".lower()
+
+
+def ngrams(text):
+    return {text[start:start + NGRAM] for start in range(len(text) - NGRAM + 1)}
+
+
+class ModSearchIndex:
+    """Trigram index over mod names, ids and workshop ids, keyed by mod UID.
+
+    Each query word is looked up by intersecting the sets of its trigrams, then checked against the indexed
+    text to drop false positives. Words shorter than a trigram are matched by scanning the indexed texts.
+    """
+
+    def __init__(self):
+        self._texts = {}
+        self._postings = {}
+
+    def __len__(self):
+        return len(self._texts)
+
+    @traced("rebuild search index")
+    def rebuild(self, mods):
+        self._texts = {}
+        self._postings = {}
+        for mod in mods:
+            self.update(mod)
+
+    def update(self, mod):
+        """Indexes a new mod or reindexes a changed one, mods whose text didn't change cost one lookup."""
+        text = search_text(mod)
+        previous = self._texts.get(mod._uid)
+        if previous == text:
+            return
+        if previous is not None:
+            self._unindex(mod._uid, previous)
+        self._texts[mod._uid] = text
+        for ngram in ngrams(text):
+            self._postings.setdefault(ngram, set()).add(mod._uid)
+
+    def remove(self, uid):
+        text = self._texts.pop(uid, None)
+        if text is not None:
+            self._unindex(uid, text)
+
+    def _unindex(self, uid, text):
+        for ngram in ngrams(text):
+            posting = self._postings.get(ngram)
+            if posting is not None:
+                posting.discard(uid)
+                if not posting:
+                    del self._postings[ngram]
+
+    def _match_word(self, word, candidates):
+        """Returns the UIDs among candidates, or among all mods if None, whose text contains word."""
+        if len(word) >= NGRAM:
+            postings = sorted((self._postings.get(ngram, set()) for ngram in ngrams(word)), key=len)
+            found = postings[0].intersection(*postings[1:])
+            candidates = found if candidates is None else candidates & found
+            if len(word) == NGRAM:
+                # The posting of a single trigram is exact, nothing to verify
+                return candidates
+        elif candidates is None:
+            candidates = self._texts.keys()
+        return {uid for uid in candidates if word in self._texts[uid]}
+
+    @traced("search mods")
+    def search(self, query):
+        """Returns the UIDs of mods matching every word of query, or None if the query is empty."""
+        words = sorted(set(query.lower().split()), key=len, reverse=True)
+        if not words:
+            return None
+        matches = None
+        for word in words:
+            # Longest words first, they have the smallest candidate sets
+            matches = self._match_word(word, matches)
+            if not matches:
+                return set()
+        return matches
+
+    def matches(self, mods, query="", filters=()):
+        """Returns for every mod whether it matches query and passes all named FILTERS."""
+        found = self.search(query)
+        checks = [FILTERS[name] for name in filters]
+        if not checks:
+            return [True] * len(mods) if found is None else [mod._uid in found for mod in mods]
+        return [(found is None or mod._uid in found) and all(check(mod) for check in checks) for mod in mods]
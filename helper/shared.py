@@ -1,7 +1,61 @@
-from helper.parser import NoitaModXml
-from helper.data import ModManagerData
-from helper.config import NoitaConfig
+"""Instances shared by the whole program, each created on first access.
 
-data = ModManagerData()
-mods = NoitaModXml()
-config = NoitaConfig()
+Importing this module is cheap: manager.json, the metadata and conflict caches and the mod list are only read
+once something asks for data, cache, conflicts and so on. Assigning an attribute replaces the instance.
+"""
+import threading
+
+_lock = threading.RLock()
+
+
+def _create_data():
+    from helper.data import ModManagerData
+    return ModManagerData()
+
+
+def _create_cache():
+    from helper.cache import ModMetadataCache
+    return ModMetadataCache()
+
+
+def _create_presets():
+    from helper.presets import PresetEngine
+    return PresetEngine(__getattr__("data"))
+
+
+def _create_mods():
+    from helper.parser import NoitaModXml
+    settings = __getattr__("data").settings
+    return NoitaModXml(workers=settings["read_workers"], history=settings["history"])
+
+
+def _create_config():
+    from helper.config import NoitaConfig
+    return NoitaConfig()
+
+
+def _create_conflicts():
+    from helper.conflicts import ConflictIndex
+    return ConflictIndex()
+
+
+_FACTORIES = {
+    "data": _create_data,
+    "cache": _create_cache,
+    "presets": _create_presets,
+    "mods": _create_mods,
+    "config": _create_config,
+    "conflicts": _create_conflicts,
+}
+
+
+def __getattr__(name):
+    """Creates a shared instance the first time it's accessed, later accesses find it as a module global."""
+    factory = _FACTORIES.get(name)
+    if factory is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # Background jobs can be the first to ask, and creating mods asks for data
+    with _lock:
+        if name not in globals():
+            globals()[name] = factory()
+        return globals()[name]
@@ -0,0 +1,33 @@
+"""Startup timing breakdown, printed once the mod list is up when the MODMANAGER_STARTUP environment variable is set.
+
+Times are measured from when this module is first imported, which manager.py does before anything else.
+"""
+import os
+import time
+
+STARTUP_ENV = "MODMANAGER_STARTUP"
+
+_enabled = bool(os.environ.get(STARTUP_ENV))
+_start = time.perf_counter()
+_marks = []
+_reported = False
+
+
+def mark(label):
+    """Records that a startup step ended, a no-op when profiling is off or startup already finished."""
+    if _enabled and not _reported:
+        _marks.append((label, time.perf_counter()))
+
+
+def report():
+    """Prints how long every step took, only the first call prints anything."""
+    global _reported
+    if not _enabled or _reported:
+        return
+    _reported = True
+    print("Startup time:")
+    previous = _start
+    for label, at in _marks:
+        print(f"  {(at - previous) * 1000:8.1f} ms  {label}")
+        previous = at
+    print(f"  {(previous - _start) * 1000:8.1f} ms  total")
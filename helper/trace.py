@@ -0,0 +1,120 @@
+"""Lightweight spans around hot paths, exported as Chrome trace JSON for chrome://tracing or ui.perfetto.dev.
+
+Tracing is off unless the MODMANAGER_TRACE environment variable is set, to "1" for the default output file
+or to a file path. While it's off, span() returns a shared no-op object and nothing is recorded.
+"""
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from helper.fileio import atomic_write
+
+TRACE_ENV = "MODMANAGER_TRACE"
+DEFAULT_TRACE_PATH = "modmanager_trace.json"
+
+_enabled = False
+_path = DEFAULT_TRACE_PATH
+_events = []
+_threads = set()
+_lock = threading.Lock()
+_pid = os.getpid()
+
+
+class _Span:
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        end = time.perf_counter_ns()
+        thread = threading.current_thread()
+        event = {"name": self.name, "ph": "X", "ts": self.start / 1000, "dur": (end - self.start) / 1000, "pid": _pid, "tid": thread.ident}
+        if self.args:
+            event["args"] = self.args
+        with _lock:
+            if thread.ident not in _threads:
+                _threads.add(thread.ident)
+                _events.append({"name": "thread_name", "ph": "M", "pid": _pid, "tid": thread.ident, "args": {"name": thread.name}})
+            _events.append(event)
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name, **args):
+    """Returns a context manager timing its block as a trace event, or a no-op one while tracing is off."""
+    if not _enabled:
+        return _NO_SPAN
+    return _Span(name, args)
+
+
+def traced(name):
+    """Decorator wrapping every call of a function in a span."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            with _Span(name, None):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def is_enabled():
+    return _enabled
+
+
+def enable(path=None):
+    """Starts recording spans, to be written to path when tracing is disabled or the program exits."""
+    global _enabled, _path
+    _path = path or DEFAULT_TRACE_PATH
+    _enabled = True
+
+
+def disable():
+    """Stops recording and writes the trace, returns the path written to or None if nothing was recorded."""
+    global _enabled
+    _enabled = False
+    return write()
+
+
+def write():
+    """Writes and clears the recorded events, returns the path written to or None if there were none."""
+    with _lock:
+        if not _events:
+            return None
+        events = list(_events)
+        _events.clear()
+        _threads.clear()
+    try:
+        atomic_write(_path, json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}).encode("utf-8"))
+    except OSError as error:
+        print(f"Couldn't write trace to {_path}: {error.strerror}.")
+        return None
+    print(f"Trace with {len(events)} events written to {_path}.")
+    return _path
+
+
+if os.environ.get(TRACE_ENV):
+    enable(None if os.environ[TRACE_ENV] == "1" else os.environ[TRACE_ENV])
+atexit.register(write)
@@ -0,0 +1,97 @@
+import os
+from helper.index import NOITA_APP_ID
+
+ESCAPES = {"n": "\n", "t": "\t", "\\": "\\", "\"": "\""}
+
+
+class WorkshopItem:
+    def __init__(self, workshop_item_id, size=0, time_updated=0, installed=False):
+        self.workshop_item_id = workshop_item_id
+        self.size = size
+        self.time_updated = time_updated
+        self.installed = installed
+
+
+def iter_tokens(file):
+    """Yields quoted strings, bare words and braces from a VDF/ACF file, one line at a time."""
+    for line in file:
+        i = 0
+        length = len(line)
+        while i < length:
+            char = line[i]
+            if char in " \t\r\n":
+                i += 1
+            elif char in "{}":
+                yield char
+                i += 1
+            elif char == "/" and line.startswith("//", i):
+                break
+            elif char == "\"":
+                i += 1
+                parts = []
+                while i < length and line[i] != "\"":
+                    if line[i] == "\\" and i + 1 < length:
+                        parts.append(ESCAPES.get(line[i + 1], line[i + 1]))
+                        i += 2
+                    else:
+                        parts.append(line[i])
+                        i += 1
+                yield "".join(parts)
+                i += 1
+            else:
+                start = i
+                while i < length and line[i] not in " \t\r\n{}\"":
+                    i += 1
+                yield line[start:i]
+
+
+def iter_values(file):
+    """Yields (section path, key, value) for every key-value pair of a VDF/ACF file without building a tree."""
+    path = []
+    key = None
+    for token in iter_tokens(file):
+        if token == "{":
+            path.append(key)
+            key = None
+        elif token == "}":
+            if path:
+                path.pop()
+            key = None
+        elif key is None:
+            key = token
+        else:
+            yield tuple(path), key, token
+            key = None
+
+
+def workshop_manifest_path(steam_root):
+    """Returns the path of Steam's manifest of installed Noita workshop items."""
+    return os.path.join(steam_root, "steamapps", "workshop", f"appworkshop_{NOITA_APP_ID}.acf")
+
+
+def read_workshop_manifest(steam_root):
+    """Reads installed workshop items from Steam's manifest, returns a dict of workshop id to WorkshopItem."""
+    items = {}
+    manifest = workshop_manifest_path(steam_root)
+    try:
+        with open(manifest, "r", encoding="utf-8", errors="replace") as file:
+            for path, key, value in iter_values(file):
+                # Only ("AppWorkshop", section, "<id>") sections describe items
+                if len(path) != 3 or not path[2].isdigit():
+                    continue
+                section = path[1]
+                if section not in ("WorkshopItemsInstalled", "WorkshopItemDetails"):
+                    continue
+                workshop_item_id = int(path[2])
+                item = items.get(workshop_item_id)
+                if item is None:
+                    item = items[workshop_item_id] = WorkshopItem(workshop_item_id)
+                if section == "WorkshopItemsInstalled":
+                    item.installed = True
+                    if key == "size" and value.isdigit():
+                        item.size = int(value)
+                if key == "timeupdated" and value.isdigit():
+                    item.time_updated = max(item.time_updated, int(value))
+    except OSError:
+        return {}
+    return items
@@ -1,11 +1,15 @@
+import helper.startup
 from PyQt6.QtWidgets import QApplication
-from PyQt6.QtGui import QIcon
+helper.startup.mark("import Qt")
 from gui.gui_main import ShittyModManager
+from gui.gui_icons import icon
 import sys
+helper.startup.mark("import GUI")
 
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
+    helper.startup.mark("create application")
     window = ShittyModManager()
-    window.setWindowIcon(QIcon("data/icons/noita.svg"))
+    window.setWindowIcon(icon("noita"))
     sys.exit(app.exec())
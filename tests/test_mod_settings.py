@@ -0,0 +1,125 @@
+import os
+import pytest
+from helper.mod_settings import ModSettingsFile, HEADER, COUNT, U32, F64, fastlz_decompress, fastlz_store, pack_settings
+
+SAMPLE = b"mod_a.setting mod_a.setting mod_a.setting " + b"x" * 300 + b"mod_b.other" * 4
+# SAMPLE compressed by the reference FastLZ implementation at level 1 and 2
+REFERENCE_BLOCKS = {
+    1: "0d6d6f645f612e73657474696e6720e0130d0078e0fd00e01c00414706622e6f74686572e0150a02686572",
+    2: "2d6d6f645f612e73657474696e6720e0130d0078e0ff2300414706622e6f74686572e0150a02686572",
+}
+
+
+def entry(key, current, upcoming=None):
+    """Encodes one setting the way the game stores it."""
+    def value(value):
+        if value is None:
+            return U32.pack(0)
+        if isinstance(value, bool):
+            return U32.pack(1) + bytes([value])
+        if isinstance(value, float):
+            return U32.pack(2) + F64.pack(value)
+        text = value.encode("utf-8")
+        return U32.pack(3) + U32.pack(len(text)) + text
+    key = key.encode("utf-8")
+    return U32.pack(len(key)) + key + value(current) + value(upcoming)
+
+
+@pytest.mark.parametrize("level", sorted(REFERENCE_BLOCKS))
+def test_decompress_reference_blocks(level):
+    assert fastlz_decompress(bytes.fromhex(REFERENCE_BLOCKS[level]), len(SAMPLE)) == SAMPLE
+
+
+@pytest.mark.parametrize("data", [b"", b"a", b"x" * 32, b"x" * 33, SAMPLE, bytes(range(256)) * 40])
+def test_store_round_trip(data):
+    assert fastlz_decompress(fastlz_store(data), len(data)) == data
+
+
+def test_decompress_rejects_wrong_size():
+    with pytest.raises(ValueError):
+        fastlz_decompress(fastlz_store(SAMPLE), len(SAMPLE) + 1)
+
+
+@pytest.mark.parametrize("length", [1, 16, 20, 38])
+def test_decompress_rejects_truncated_block(length):
+    with pytest.raises(ValueError):
+        fastlz_decompress(bytes.fromhex(REFERENCE_BLOCKS[1])[:length], len(SAMPLE))
+
+
+def test_truncated_file_is_reported(tmp_path):
+    path = str(tmp_path / "mod_settings.bin")
+    block = bytes.fromhex(REFERENCE_BLOCKS[1])[:16]
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(len(block), len(SAMPLE)) + block)
+    settings_file = ModSettingsFile.for_path(path)
+    assert isinstance(settings_file.error, ValueError)
+    assert settings_file.settings("mod_a") == {}
+    with pytest.raises(ValueError):
+        settings_file.restore(pack_settings([entry("mod_a.volume", 0.5)]))
+
+
+def test_uncompressed_file_is_not_kept_mapped(tmp_path):
+    path = str(tmp_path / "mod_settings.bin")
+    payload = COUNT.pack(1) + entry("mod_a.volume", 0.5)
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(len(payload), len(payload)) + payload)
+    settings_file = ModSettingsFile.for_path(path)
+    if os.path.exists("/proc/self/maps"):
+        with open("/proc/self/maps") as maps:
+            assert path not in maps.read()
+    os.remove(path)
+    assert settings_file.settings("mod_a") == {"volume": (0.5, None)}
+    settings_file.close()
+
+
+def test_settings_are_decoded_per_mod(tmp_path):
+    path = tmp_path / "mod_settings.bin"
+    path.write_bytes(pack_settings([entry("mod_a.volume", 0.5, 1.0), entry("mod_a.name", "Mina"), entry("mod_b.on", True)]))
+    with ModSettingsFile(str(path)) as settings_file:
+        assert sorted(settings_file.mod_ids()) == ["mod_a", "mod_b"]
+        assert settings_file.settings("mod_a") == {"volume": (0.5, 1.0), "name": ("Mina", None)}
+        assert settings_file.settings("missing") == {}
+
+
+def test_restore_keeps_other_mods(tmp_path):
+    path = str(tmp_path / "mod_settings.bin")
+    with open(path, "wb") as file:
+        file.write(pack_settings([entry("mod_a.volume", 0.5), entry("mod_b.on", True), entry("mod_c.name", "old")]))
+    settings_file = ModSettingsFile.for_path(path)
+    snapshot = settings_file.snapshot(["mod_c"])
+
+    with open(path, "wb") as file:
+        file.write(pack_settings([entry("mod_a.volume", 0.25), entry("mod_b.on", False), entry("mod_c.name", "new"), entry("mod_d.x", 1.0)]))
+    # The instance is stale now, entries to keep have to come from the file as it is
+    assert settings_file.restore(snapshot) == 1
+
+    restored = ModSettingsFile.for_path(path)
+    assert restored.settings("mod_a") == {"volume": (0.25, None)}
+    assert restored.settings("mod_b") == {"on": (False, None)}
+    assert restored.settings("mod_c") == {"name": ("old", None)}
+    assert restored.settings("mod_d") == {"x": (1.0, None)}
+    restored.close()
+
+
+def test_restore_through_closed_instance(tmp_path):
+    path = str(tmp_path / "mod_settings.bin")
+    with open(path, "wb") as file:
+        file.write(pack_settings([entry("mod_a.volume", 0.5), entry("mod_b.on", True)]))
+    settings_file = ModSettingsFile.for_path(path)
+    snapshot = settings_file.snapshot(["mod_b"])
+    settings_file.close()
+
+    assert ModSettingsFile.for_path(path) is not settings_file
+    settings_file.restore(snapshot)
+    with ModSettingsFile(path) as restored:
+        assert sorted(restored.mod_ids()) == ["mod_a", "mod_b"]
+
+
+def test_restore_refuses_unparsable_file(tmp_path):
+    path = str(tmp_path / "mod_settings.bin")
+    with open(path, "wb") as file:
+        file.write(pack_settings([entry("mod_a.volume", 0.5)])[:-3])
+    snapshot = pack_settings([entry("mod_b.on", True)])
+    with pytest.raises(ValueError):
+        ModSettingsFile(path).restore(snapshot)
+    assert os.path.getsize(path) > 0